@@ -1,8 +1,22 @@
-import pygame
+import argparse
+import functools
 import random
-import math
-import numpy as np
-from scipy.constants import g
+import time
+
+import pygame
+
+from bulletsim.bullet_pool import BULLET_SIZE
+from bulletsim.dirty_rects import DirtyRectRenderer
+from bulletsim.replay import SCENE_2D, InputRecorder
+from bulletsim.sim2d import AIR_DENSITY, EVENT_FORMATS, FIRE, RED, WIND_SPEED, demo_world
+from bulletsim.text_cache import Label, TextCache
+from bulletsim.timestep import FixedTimestep
+
+parser = argparse.ArgumentParser(description="Shoot at a wooden and a glass cube in 2D.")
+parser.add_argument('--record', metavar='LOG',
+                    help="record the session's inputs to LOG; replay it with python -m bulletsim.replay LOG")
+parser.add_argument('--seed', type=int, help="seed for bullet spread and explosions (random by default)")
+args = parser.parse_args()
 
 # Initialize Pygame
 pygame.init()
@@ -15,147 +29,75 @@ pygame.display.set_caption("Bullet Physics Demo")
 # Define colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
-RED = (255, 0, 0)
-BLUE = (0, 0, 255)
 
 font = pygame.font.Font('freesansbold.ttf', 32)
 small_font = pygame.font.Font('freesansbold.ttf', 12)
+text_cache = TextCache()
 input_rect = pygame.Rect(200, 200, 140, 32)
 user_text = 'hello'
 bullet_speed = 10
 spin_rate = 0
-air_density = 1.0  # Example air density (can be adjusted)
-wind_speed = 1.0  # Example wind speed (can be adjusted)
-
-# Define bullet class
-class Bullet(pygame.sprite.Sprite):
-    def __init__(self, x, y, angle, speed, shape, drag_coefficient, spin_rate):
-        super().__init__()
-        self.image = pygame.Surface((10, 10))
-        self.image.fill(WHITE)
-        self.rect = self.image.get_rect()
-        self.rect.center = (x, y)
-        self.angle = math.radians(angle)
-        self.speed = speed
-        self.velocity = np.array([math.cos(self.angle) * self.speed, -math.sin(self.angle) * self.speed], dtype=np.float64)
-        self.mass = 0.05
-        self.shape = shape
-        self.drag_coefficient = drag_coefficient
-        self.spin_rate = spin_rate
-        self.angular_velocity = self.spin_rate * self.shape / 2  # Assume constant angular velocity for simplicity
-
-    def update(self, air_density, wind_speed, wind_direction, latitude):
-        # Calculate bullet's acceleration due to air resistance, gravity, and Magnus effect
-        bullet_velocity = np.linalg.norm(self.velocity)
-        bullet_drag = 0.5 * air_density * bullet_velocity**2 * self.drag_coefficient * self.shape
-        bullet_drag *= -1  # Opposite direction of bullet's velocity
-        bullet_gravity = np.array([0.0, self.mass * g])
-        bullet_coriolis = 2 * self.velocity * np.array([-math.sin(latitude), 0.0])
-        bullet_wind = wind_speed * np.array([math.cos(wind_direction), -math.sin(wind_direction)])
-
-        # Calculate Magnus effect force
-        bullet_angular_velocity = self.angular_velocity * np.array([0.0, 0.0, 1.0])
-        bullet_magnus = np.cross(bullet_angular_velocity, self.velocity)[:, np.newaxis] * self.mass * self.drag_coefficient * self.shape
-
-
-        self.acceleration = bullet_drag + bullet_gravity + bullet_coriolis + bullet_wind + bullet_magnus
-
-        self.velocity += self.acceleration.flatten()[:2]
-        self.rect.move_ip(self.velocity)
-
-        if self.rect.right < 0 or self.rect.left > screen_width or self.rect.bottom < 0 or self.rect.top > screen_height:
-            self.kill()
-
-
-# Define cube class
-class Cube(pygame.sprite.Sprite):
-    def __init__(self, x, y, size, color, mass):
-        super().__init__()
-        self.original_image = pygame.Surface((size, size))
-        self.original_image.fill(color)
-        self.image = self.original_image.copy()
-        self.rect = self.image.get_rect()
-        self.rect.center = (x, y)
-        self.color = color
-        self.size = size
-        self.mass = mass
-        self.velocity = np.array([0.0, 0.0])  # Change to float arrays
-        self.is_broken = False
-
-    def update(self, air_density, wind_speed, wind_direction, latitude):
-        if not self.is_broken:
-            self.velocity += np.array([0.0, self.mass * g])  # Use the g constant as a float
-            self.rect.move_ip(self.velocity)
-
-            # Simulate a floor
-            if self.rect.bottom >= screen_height:
-                self.rect.bottom = screen_height
-                self.velocity[1] = 0.0
-
-    def explode(self):
-        if self.color == BLUE:  # Glass cube shatters
-            self.is_broken = True
-
-            # Generate smaller glass pieces
-            num_pieces = random.randint(8, 12)
-            piece_size = self.size // num_pieces
-            for _ in range(num_pieces):
-                piece_x = self.rect.x + random.randint(0, self.size - piece_size)
-                piece_y = self.rect.y + random.randint(0, self.size - piece_size)
-                piece = Cube(piece_x, piece_y, piece_size, BLUE, self.mass * 0.1)
-                piece.velocity = np.array([random.uniform(-10, 10), random.uniform(-15, -10)])
-                all_sprites.add(piece)
-                cubes.add(piece)
-
-            # Shrink the original cube
-            self.size = self.size // 2
-            self.image = pygame.transform.scale(self.original_image, (self.size, self.size))
-            self.rect = self.image.get_rect(center=self.rect.center)
-
-        elif self.color == RED:  # Wooden cube breaks apart
-            self.is_broken = True
-
-            # Generate smaller wooden pieces
-            num_pieces = random.randint(4, 8)
-            piece_size = self.size // num_pieces
-            for _ in range(num_pieces):
-                piece_x = self.rect.x + random.randint(0, self.size - piece_size)
-                piece_y = self.rect.y + random.randint(0, self.size - piece_size)
-                piece = Cube(piece_x, piece_y, piece_size, RED, self.mass * 0.1)
-                piece.velocity = np.array([random.uniform(-5, 5), random.uniform(-2, 2)])
-                all_sprites.add(piece)
-                cubes.add(piece)
-
-            # Shrink the original cube
-            self.size = self.size // 2
-            self.image = pygame.transform.scale(self.original_image, (self.size, self.size))
-            self.rect = self.image.get_rect(center=self.rect.center)
-
-        # Generate smaller pieces within the original cube
-        num_inner_pieces = random.randint(4, 8)
-        inner_piece_size = self.size // num_inner_pieces
-        for _ in range(num_inner_pieces):
-            inner_piece_x = self.rect.x + random.randint(0, self.size - inner_piece_size)
-            inner_piece_y = self.rect.y + random.randint(0, self.size - inner_piece_size)
-            inner_piece = Cube(inner_piece_x, inner_piece_y, inner_piece_size, self.color, self.mass * 0.1)
-            inner_piece.velocity = np.array([random.uniform(-5, 5), random.uniform(-5, 5)])
-            all_sprites.add(inner_piece)
-            cubes.add(inner_piece)
-
-# Create groups for sprites
-all_sprites = pygame.sprite.Group()
-bullets = pygame.sprite.Group()
-cubes = pygame.sprite.Group()
-
-# Create a wooden cube
-wooden_cube = Cube(screen_width // 2 - 100, screen_height // 2, 100, RED, 1.0)
-all_sprites.add(wooden_cube)
-cubes.add(wooden_cube)
-
-# Create a glass cube
-glass_cube = Cube(screen_width // 2 + 100, screen_height // 2, 100, BLUE, 0.5)
-all_sprites.add(glass_cube)
-cubes.add(glass_cube)
+physics_substeps = 1  # Substeps per 1/60 s physics step; swept collision already stops tunnelling
+unthrottled = False  # Run physics flat out to measure its throughput (toggle with U)
+dirty_rects = True  # Only redraw regions that changed (toggle with R)
+
+# The simulation itself lives in bulletsim.sim2d; this file only turns input into events for it and draws
+seed = args.seed if args.seed is not None else random.randrange(2**63)
+world = demo_world(seed)
+recorder = InputRecorder(args.record, SCENE_2D, seed, EVENT_FORMATS, physics_substeps) if args.record else None
+
+
+def send(code, *values):
+    if recorder is not None:
+        recorder.event(code, *values)
+    world.apply(code, values)
+
+
+def print_impact(bullet, cube, impact):
+    print("Bullet Mass:", impact.bullet_mass, "kg")
+    print("Bullet Velocity Before:", impact.bullet_velocity, "m/s")
+    print("Bullet Velocity After:", round(impact.bullet_velocity_after, 2), "m/s")
+    print("Cube Mass:", impact.cube_mass, "kg")
+    print("Energy Absorbed by Cube:", round(impact.energy_absorbed, 2), "J")
+    print("")
+
+
+world.on_hit = print_impact
+
+
+@functools.lru_cache(maxsize=None)
+def cube_image(size, color):
+    # One surface per size and colour, shared by every cube that looks the same
+    image = pygame.Surface((size, size))
+    image.fill(color)
+    return image
+
+
+bullet_image = pygame.Surface((BULLET_SIZE, BULLET_SIZE))
+bullet_image.fill(WHITE)
+
+# HUD labels only re-render when the values they show change
+bullet_speed_label = Label(text_cache, font, "Bullet speed: {0}m/s", RED)
+spin_rate_label = Label(text_cache, font, "Spin Rate: {0}", WHITE)
+wind_speed_label = Label(text_cache, font, "Wind Speed: {0}", WHITE)
+air_density_label = Label(text_cache, font, "Air Density: {0}", WHITE)
+information_label = Label(text_cache, small_font, "Press the up and down arrow keys to adjust speed, left and right for adjusting spin.", WHITE)
+information_label2 = Label(text_cache, small_font, "You can also change the wind speed and air density with WASD!", WHITE)
+user_input_label = Label(text_cache, font, "{0}", (255, 255, 255))
+debris_label = Label(text_cache, small_font, "Debris: {0} live, pool hit rate {1:.0%}", WHITE)
+pairs_label = Label(text_cache, small_font, "Collision pairs tested: {0} of {1}", WHITE)
+physics_label = Label(text_cache, small_font, "Physics: {0:.0f} steps/s ({1})", WHITE)
+sleep_label = Label(text_cache, small_font, "Cubes: {0} awake, {1} asleep", WHITE)
+frame_label = Label(text_cache, small_font, "Display: {0:.0f} fps, {1:.2f} ms/frame drawing ({2})", WHITE)
+
+# Physics advances in fixed 1/60 s steps, however long each frame takes
+timestep = FixedTimestep(substeps=physics_substeps, unthrottled=unthrottled)
+physics_rate = 0.0
+next_report = 1000
+renderer = DirtyRectRenderer(BLACK)
+draw_time = 0.0
+draw_frames = 0
+draw_ms = 0.0
 
 # Set up the clock
 clock = pygame.time.Clock()
@@ -164,6 +106,8 @@ clock = pygame.time.Clock()
 running = True
 
 while running:
+    frame_time = clock.tick(0 if timestep.unthrottled else 60) / 1000.0
+
     # Handle events
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -171,7 +115,7 @@ while running:
 
         if event.type == pygame.KEYDOWN:
             user_text += event.unicode
-            
+
             if event.key == pygame.K_UP:
                 bullet_speed += 2
             elif event.key == pygame.K_DOWN:
@@ -183,90 +127,76 @@ while running:
             elif event.key == pygame.K_RIGHT:
                 spin_rate += 1
             elif event.key == pygame.K_w:
-                wind_speed += 1
+                send(WIND_SPEED, world.wind_speed + 1)
             elif event.key == pygame.K_s:
-                wind_speed -= 1
+                send(WIND_SPEED, world.wind_speed - 1)
             elif event.key == pygame.K_a:
-                air_density -= 1
+                send(AIR_DENSITY, world.air_density - 1)
             elif event.key == pygame.K_d:
-                air_density += 1
+                send(AIR_DENSITY, world.air_density + 1)
+            elif event.key == pygame.K_u:
+                timestep.unthrottled = not timestep.unthrottled
+            elif event.key == pygame.K_r:
+                dirty_rects = not dirty_rects
+                renderer.invalidate()
 
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:  # Left mouse button
                 mouse_pos = pygame.mouse.get_pos()
-                bullet_angle = random.uniform(-5, 5)
-                bullet_shape = 0.01  # Example shape (can be adjusted)
-                bullet_drag_coefficient = 0.3  # Example drag coefficient (can be adjusted)
-                bullet = Bullet(*mouse_pos, bullet_angle, bullet_speed, bullet_shape, bullet_drag_coefficient, spin_rate)
-                all_sprites.add(bullet)
-                bullets.add(bullet)
+                send(FIRE, *mouse_pos, bullet_speed, spin_rate)
 
     # Update
-
-    wind_direction = math.radians(0)  # Example wind direction (can be adjusted)
-    latitude = math.radians(0)  # Example latitude (can be adjusted)
-
-    all_sprites.update(air_density, wind_speed, wind_direction, latitude)
-    bulletspeedtext = font.render("Bullet speed: {0}m/s".format(bullet_speed), True, RED)
-    spinratetext = font.render("Spin Rate: {0}".format(spin_rate), True, WHITE)
-    windspeedtext = font.render("Wind Speed: {0}".format(wind_speed), True, WHITE)
-    airdensitytext = font.render("Air Density: {0}".format(air_density), True, WHITE)
-    informationtext = small_font.render("Press the up and down arrow keys to adjust speed, left and right for adjusting spin.", True, WHITE)
-    informationtext2 = small_font.render("You can also change the wind speed and air density with WASD!", True, WHITE)
-    userinput = font.render(user_text, True, (255, 255, 255))
-
-    # Check for bullet-cube collision
-    for bullet in bullets:
-        for cube in cubes:
-            if bullet.rect.colliderect(cube.rect):
-                bullet_mass = bullet.mass
-                bullet_velocity = np.linalg.norm(bullet.velocity)
-                cube_mass = cube.mass
-
-                # Calculate initial momentum of the bullet and the cube
-                bullet_momentum = bullet_mass * bullet_velocity
-                cube_momentum = cube_mass * np.linalg.norm(cube.velocity)
-
-                # Calculate the conservation of momentum
-                total_momentum = bullet_momentum + cube_momentum
-                bullet_velocity_after = total_momentum / bullet_mass
-
-                # Calculate the kinetic energy of the bullet before and after the collision
-                bullet_kinetic_energy_before = 0.5 * bullet_mass * bullet_velocity**2
-                bullet_kinetic_energy_after = 0.5 * bullet_mass * bullet_velocity_after**2
-
-                # Calculate the energy absorbed by the cube
-                energy_absorbed = bullet_kinetic_energy_before - bullet_kinetic_energy_after
-
-                # Apply the velocity change to the bullet
-                bullet.velocity = np.array([math.cos(bullet.angle) * bullet_velocity_after, -math.sin(bullet.angle) * bullet_velocity_after])
-
-                cube.explode()
-                bullet.kill()
-
-                print("Bullet Mass:", bullet_mass, "kg")
-                print("Bullet Velocity Before:", bullet_velocity, "m/s")
-                print("Bullet Velocity After:", round(bullet_velocity_after, 2), "m/s")
-                print("Cube Mass:", cube_mass, "kg")
-                print("Energy Absorbed by Cube:", round(energy_absorbed, 2), "J")
-                print("")
-
-    # Draw
-    screen.fill(BLACK)
-    for sprite in all_sprites:
-        screen.blit(sprite.image, sprite.rect)
-    screen.blit(spinratetext, (0, 40))
-    screen.blit(informationtext, (0, 160))
-    screen.blit(informationtext2, (0, 180))
-    screen.blit(airdensitytext, (0, 120))
-    screen.blit(windspeedtext, (0, 80))
-    screen.blit(bulletspeedtext, (0,0))
-
-    # Update the display
-    pygame.display.flip()
-
-    # Limit the frame rate
-    clock.tick(60)
+    steps = timestep.run(frame_time, world.step, world.begin_step)
+    if recorder is not None:
+        recorder.end_frame(steps)
+    if pygame.time.get_ticks() >= next_report:
+        physics_rate = timestep.steps_per_second()
+        draw_ms = 1000 * draw_time / max(draw_frames, 1)
+        draw_time = 0.0
+        draw_frames = 0
+        next_report = pygame.time.get_ticks() + 1000
+
+    bulletspeedtext = bullet_speed_label.render(bullet_speed)
+    spinratetext = spin_rate_label.render(spin_rate)
+    windspeedtext = wind_speed_label.render(world.wind_speed)
+    airdensitytext = air_density_label.render(world.air_density)
+    informationtext = information_label.render()
+    informationtext2 = information_label2.render()
+    userinput = user_input_label.render(user_text)
+    debristext = debris_label.render(len(world.fragment_pool), round(world.fragment_pool.hit_rate, 2))
+    pairstext = pairs_label.render(world.candidate_pairs, world.naive_pairs)
+    sleeptext = sleep_label.render(len(world.active_cubes), world.sleeping_cubes.size)
+    physicstext = physics_label.render(physics_rate, "unthrottled" if timestep.unthrottled else "fixed 60 Hz")
+    frametext = frame_label.render(round(clock.get_fps()), round(draw_ms, 2), "dirty rects" if dirty_rects else "full redraw")
+
+    # Draw everything between its last two physics states, so motion stays smooth at any frame rate
+    alpha = timestep.alpha
+    scene = []
+    for cube in world.cubes:
+        image = cube_image(cube.size, cube.color)
+        scene.append((cube, image, image.get_rect(center=cube.interpolated_center(alpha))))
+    for bullet in world.bullets:
+        scene.append((bullet, bullet_image, bullet_image.get_rect(center=bullet.interpolated_center(alpha))))
+    hud = [(spinratetext, (0, 40)), (informationtext, (0, 160)), (informationtext2, (0, 180)),
+           (pairstext, (0, 200)), (debristext, (0, 220)), (physicstext, (0, 240)), (frametext, (0, 260)),
+           (sleeptext, (0, 280)),
+           (airdensitytext, (0, 120)), (windspeedtext, (0, 80)), (bulletspeedtext, (0, 0))]
+    scene += [(position, text, text.get_rect(topleft=position)) for text, position in hud]
+
+    draw_start = time.perf_counter()
+    if dirty_rects:
+        # Only the regions that changed are redrawn and sent to the display
+        pygame.display.update(renderer.draw(screen, scene))
+    else:
+        screen.fill(BLACK)
+        for _, image, rect in scene:
+            screen.blit(image, rect)
+        pygame.display.flip()
+    draw_time += time.perf_counter() - draw_start
+    draw_frames += 1
 
 # Quit the game
+if recorder is not None:
+    recorder.close()
+print("HUD text cache:", text_cache.cache_info())
 pygame.quit()
@@ -0,0 +1,43 @@
+from types import ModuleType as _ModuleType
+
+from bulletsim.trajectory import (
+    G, RHO, C_D, A, MASS, INITIAL_VELOCITY, LAUNCH_ANGLE, TIME_STEP, SPEED_OF_SOUND, integrate_trajectory
+    )
+from bulletsim.batch import BatchResult, solve_batch
+from bulletsim.adaptive import AdaptiveResult, integrate_adaptive
+from bulletsim.firing_table import FiringSolution, FiringTable, load_or_build, prune_cache
+from bulletsim.inverse import AngleSolution, solve_angle, solve_angles
+from bulletsim.streaming import estimate_flight_time, iter_trajectory, collect_trajectory, write_trajectory
+from bulletsim.forces import bullet_acceleration
+from bulletsim.dispersion import ShotSpread, DispersionResult, simulate_dispersion
+from bulletsim.drag import DragTable, G1, G7, DRAG_MODELS
+from bulletsim.decimate import decimate, lttb, min_max
+from bulletsim.bullet_pool import BulletPool
+from bulletsim.broadphase import SpatialHash
+from bulletsim.fragments import FragmentPool
+from bulletsim.text_cache import TextCache, Label
+from bulletsim.timestep import FixedTimestep
+from bulletsim.dirty_rects import DirtyRectRenderer
+from bulletsim.sweep import SweepHits, sweep_aabb, first_hits
+from bulletsim.sim2d import World
+from bulletsim.sim3d import Scene
+from bulletsim.fragment_store import FragmentStore
+from bulletsim.bullet_manager import BulletManager
+from bulletsim.narrowphase import SphereHits, sphere_aabb, sweep_spheres
+
+
+# Modules that also run as ``python -m`` are only imported on first use; importing them here
+# would put them in sys.modules before runpy executes them
+_LAZY = {'Atmosphere': 'bulletsim.atmosphere', 'ISA': 'bulletsim.atmosphere'}
+
+# Star-imports name the lazy exports too, resolving them through __getattr__
+__all__ = [name for name, value in globals().items()
+           if not name.startswith('_') and not isinstance(value, _ModuleType)] + list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = globals()[name] = getattr(importlib.import_module(_LAZY[name]), name)
+    return value
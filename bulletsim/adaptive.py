@@ -0,0 +1,166 @@
+import math
+from typing import NamedTuple, Optional
+
+from bulletsim.trajectory import G, RHO, C_D, A, MASS, INITIAL_VELOCITY, LAUNCH_ANGLE, SPEED_OF_SOUND
+
+# Dormand-Prince 5(4) tableau
+_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+# 5th order weights are the last row of _A (FSAL); these are 5th minus 4th order
+_E = (71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+SAFETY = 0.9
+MIN_FACTOR = 0.2
+MAX_FACTOR = 5.0
+
+
+class AdaptiveResult(NamedTuple):
+    range: float  # Horizontal distance at the y = 0 crossing (m)
+    time_of_flight: float  # Time of the y = 0 crossing (s)
+    impact_velocity: float  # Speed at the y = 0 crossing (m/s)
+    apex_height: float  # Height where vy changes sign (m)
+    steps: int  # Accepted steps
+    rejected_steps: int  # Steps thrown away by the error control
+    evaluations: int  # Right-hand side evaluations, including event location
+    path: Optional[list] = None  # (t, x, y) at every accepted step
+
+
+def _constant_drag(k):
+    def derivative(state):
+        x, y, vx, vy = state
+        return (vx, vy, -k * vx * vx, -G - k * vy * vy)
+    return derivative
+
+
+def _variable_drag(drag_coefficient, area, mass, drag_model, atmosphere, altitude):
+    coefficient = None if drag_model is None else drag_model.coefficient
+    conditions_at = None if atmosphere is None else atmosphere.conditions_at
+
+    def derivative(state):
+        x, y, vx, vy = state
+        rho, speed_of_sound = (RHO, SPEED_OF_SOUND) if conditions_at is None else conditions_at(altitude + y)
+        cd = drag_coefficient if coefficient is None else coefficient(math.hypot(vx, vy) / speed_of_sound)
+        k = 0.5 * rho * cd * area / mass
+        return (vx, vy, -k * vx * vx, -G - k * vy * vy)
+    return derivative
+
+
+def _step(state, f0, h, derivative):
+    """Take one Dormand-Prince step; returns (new_state, f_new, error_vector)."""
+    stages = [f0]
+    for i in range(1, 7):
+        coefficients = _A[i]
+        trial = tuple(state[j] + h * sum(a * s[j] for a, s in zip(coefficients, stages)) for j in range(4))
+        stages.append(derivative(trial))
+    # trial from the last stage is the 5th order solution and stages[6] its derivative (FSAL)
+    error = tuple(h * sum(e * s[j] for e, s in zip(_E, stages)) for j in range(4))
+    return trial, stages[6], error
+
+
+def _locate(state, f0, h, end_state, derivative, component, tolerance, max_iterations=50):
+    """Find the time within step ``h`` at which ``state[component]`` reaches zero.
+
+    Each trial is a fresh Dormand-Prince step from ``state``, so the located state is
+    as accurate as an accepted step. Uses the Illinois variant of regula falsi.
+    """
+    lo, f_lo = 0.0, state[component]
+    hi, f_hi = h, end_state[component]
+    mid, mid_state = hi, end_state
+    evaluations = 0
+    side = 0
+    for _ in range(max_iterations):
+        mid = (lo * f_hi - hi * f_lo) / (f_hi - f_lo)
+        mid_state, _, _ = _step(state, f0, mid, derivative)
+        evaluations += 6
+        f_mid = mid_state[component]
+        if abs(f_mid) <= tolerance or hi - lo <= 1e-14 * h:
+            return mid, mid_state, evaluations
+        if (f_mid < 0) == (f_hi < 0):
+            hi, f_hi = mid, f_mid
+            if side == -1:
+                f_lo /= 2
+            side = -1
+        else:
+            lo, f_lo = mid, f_mid
+            if side == 1:
+                f_hi /= 2
+            side = 1
+    return mid, mid_state, evaluations
+
+
+def integrate_adaptive(initial_velocity=INITIAL_VELOCITY, launch_angle=LAUNCH_ANGLE, mass=MASS,
+                       drag_coefficient=C_D, area=A, rtol=1e-6, atol=1e-9, first_step=None,
+                       max_step=math.inf, max_time=1000.0, record_path=False, drag_model=None,
+                       atmosphere=None, altitude=0.0) -> AdaptiveResult:
+    """Integrate a single shot with Dormand-Prince 5(4) and locate the ground impact.
+
+    Solves the same equations of motion as ``integrate_trajectory``. Step size is
+    chosen from the embedded error estimate against ``rtol``/``atol``; the apex
+    (vy = 0) and impact (y = 0) are found by root-finding over the step size from
+    the last accepted state rather than by stepping past them, to within ``atol``.
+    ``steps``/``rejected_steps`` are directly comparable with the number of samples
+    ``integrate_trajectory`` needs for the same accuracy. ``drag_model``,
+    ``atmosphere`` and ``altitude`` work as in ``integrate_trajectory``.
+    """
+    if drag_model is None and atmosphere is None:
+        derivative = _constant_drag(0.5 * RHO * drag_coefficient * area / mass)
+    else:
+        derivative = _variable_drag(drag_coefficient, area, mass, drag_model, atmosphere, altitude)
+    state = (0.0, 0.0, initial_velocity * math.cos(launch_angle), initial_velocity * math.sin(launch_angle))
+    f0 = derivative(state)
+    time = 0.0
+    evaluations = 1
+
+    if first_step is None:
+        # Rough initial guess: a step that changes the velocity by about 1%
+        speed = math.hypot(state[2], state[3]) or 1.0
+        first_step = min(max_step, 0.01 * speed / math.hypot(f0[2], f0[3]))
+    h = first_step
+
+    steps = rejected = 0
+    apex = 0.0 if state[3] <= 0 else None
+    path = [(time, state[0], state[1])] if record_path else None
+
+    while time < max_time:
+        h = min(h, max_step, max_time - time)
+        new_state, f_new, error = _step(state, f0, h, derivative)
+        evaluations += 6
+
+        norm = math.sqrt(sum(
+            (e / (atol + rtol * max(abs(s), abs(n)))) ** 2 for e, s, n in zip(error, state, new_state)) / 4)
+        if norm > 1.0:
+            rejected += 1
+            h *= max(MIN_FACTOR, SAFETY * norm ** -0.2)
+            continue
+
+        if apex is None and new_state[3] <= 0:
+            _, apex_state, used = _locate(state, f0, h, new_state, derivative, 3, atol)
+            evaluations += used
+            apex = apex_state[1]
+
+        if new_state[1] < 0:
+            offset, impact, used = _locate(state, f0, h, new_state, derivative, 1, atol)
+            steps += 1
+            evaluations += used
+            time += offset
+            if path is not None:
+                path.append((time, impact[0], 0.0))
+            return AdaptiveResult(impact[0], time, math.hypot(impact[2], impact[3]), apex,
+                                  steps, rejected, evaluations, path)
+
+        steps += 1
+        time += h
+        state, f0 = new_state, f_new
+        if path is not None:
+            path.append((time, state[0], state[1]))
+        h *= min(MAX_FACTOR, SAFETY * norm ** -0.2) if norm > 0 else MAX_FACTOR
+
+    return AdaptiveResult(math.nan, math.nan, math.nan, math.nan if apex is None else apex,
+                          steps, rejected, evaluations, path)
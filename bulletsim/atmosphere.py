@@ -0,0 +1,158 @@
+import math
+import time
+
+import numpy as np
+
+# International Standard Atmosphere, troposphere and lower stratosphere
+SEA_LEVEL_TEMPERATURE = 288.15  # K
+SEA_LEVEL_PRESSURE = 101325.0  # Pa
+LAPSE_RATE = -0.0065  # K/m, up to the tropopause
+TROPOPAUSE = 11000.0  # m
+GAS_CONSTANT = 287.05287  # Specific gas constant of dry air (J/(kg K))
+HEAT_CAPACITY_RATIO = 1.4
+STANDARD_GRAVITY = 9.80665  # m/s^2
+
+
+def isa_temperature_pressure(altitude, temperature_offset=0.0, sea_level_pressure=SEA_LEVEL_PRESSURE):
+    """ISA temperature (K) and pressure (Pa) at an array of geopotential altitudes (m).
+
+    ``temperature_offset`` shifts the whole temperature profile (an "ISA + dT" day);
+    pressure keeps the standard profile scaled to ``sea_level_pressure``. The
+    stratosphere is modelled as isothermal, which holds up to 20 km.
+    """
+    altitude = np.asarray(altitude, dtype=np.float64)
+    exponent = -STANDARD_GRAVITY / (LAPSE_RATE * GAS_CONSTANT)
+
+    troposphere = np.minimum(altitude, TROPOPAUSE)
+    temperature = SEA_LEVEL_TEMPERATURE + LAPSE_RATE * troposphere
+    pressure = sea_level_pressure * (temperature / SEA_LEVEL_TEMPERATURE) ** exponent
+
+    above = np.maximum(altitude - TROPOPAUSE, 0.0)
+    pressure = pressure * np.exp(-STANDARD_GRAVITY * above / (GAS_CONSTANT * temperature))
+    return temperature + temperature_offset, pressure
+
+
+class Atmosphere:
+    """Air density and speed of sound tabulated against altitude.
+
+    Both profiles are computed once on a uniform grid of ``step`` metres between
+    ``min_altitude`` and ``max_altitude``, with per-cell slopes, so a lookup is an
+    index cast and a multiply-add instead of a power and an exponential. Altitudes
+    outside the grid are clamped to its ends. The default 10 m grid keeps density
+    within 3e-7 of the formula and the tables small enough to stay in cache.
+    """
+
+    def __init__(self, temperature_offset=0.0, sea_level_pressure=SEA_LEVEL_PRESSURE,
+                 min_altitude=-1000.0, max_altitude=20000.0, step=10.0):
+        self.temperature_offset = temperature_offset
+        self.sea_level_pressure = sea_level_pressure
+        self.min_altitude = min_altitude
+        self.step = step
+        self.altitude = min_altitude + step * np.arange(int(round((max_altitude - min_altitude) / step)) + 1)
+
+        temperature, pressure = isa_temperature_pressure(self.altitude, temperature_offset, sea_level_pressure)
+        self.temperature = temperature
+        self.pressure = pressure
+        self.density_values = pressure / (GAS_CONSTANT * temperature)
+        self.speed_of_sound_values = np.sqrt(HEAT_CAPACITY_RATIO * GAS_CONSTANT * temperature)
+
+        # value = intercept + slope * (altitude - min_altitude) / step on each cell
+        self._inverse_step = 1.0 / step
+        self._last = len(self.altitude) - 1
+        self._density = self._segments(self.density_values)
+        self._speed_of_sound = self._segments(self.speed_of_sound_values)
+        # One tuple per cell for the scalar integrators, where indexing NumPy arrays is slow, fetched
+        # with the index scaling and clamp limit in one attribute lookup
+        rows = list(zip(*(values.tolist() for values in self._density + self._speed_of_sound)))
+        self._scalar = (rows, -min_altitude * self._inverse_step, self._inverse_step, float(self._last))
+
+    def __repr__(self):
+        return (f"Atmosphere(temperature_offset={self.temperature_offset!r}, "
+                f"sea_level_pressure={self.sea_level_pressure!r})")
+
+    @staticmethod
+    def _segments(values):
+        slope = np.append(np.diff(values), 0.0)
+        intercept = values - slope * np.arange(len(values))
+        return np.ascontiguousarray(slope), np.ascontiguousarray(intercept)
+
+    def _position(self, altitude):
+        position = np.subtract(altitude, self.min_altitude, dtype=np.float64)
+        position *= self._inverse_step
+        # fmax/fmin rather than clip so NaN altitudes land on cell 0 instead of a bad cast
+        np.fmax(position, 0, out=position)
+        np.fmin(position, self._last, out=position)
+        return position, position.astype(np.intp)
+
+    @staticmethod
+    def _evaluate(segments, position, index, out):
+        slope, intercept = segments
+        out = np.multiply(np.take(slope, index, mode='clip'), position, out=out)
+        out += np.take(intercept, index, mode='clip')
+        return out
+
+    def density(self, altitude, out=None):
+        """Air density (kg/m^3) at an array of altitudes (m)."""
+        return self._evaluate(self._density, *self._position(altitude), out)
+
+    def speed_of_sound(self, altitude, out=None):
+        """Speed of sound (m/s) at an array of altitudes (m)."""
+        return self._evaluate(self._speed_of_sound, *self._position(altitude), out)
+
+    def conditions(self, altitude, out_density=None, out_speed_of_sound=None):
+        """``(density, speed_of_sound)`` arrays, locating each altitude's cell only once."""
+        position, index = self._position(altitude)
+        return (self._evaluate(self._density, position, index, out_density),
+                self._evaluate(self._speed_of_sound, position, index, out_speed_of_sound))
+
+    def conditions_at(self, altitude):
+        """``(density, speed_of_sound)`` at a single altitude, without NumPy overhead."""
+        rows, offset, inverse_step, last = self._scalar
+        position = altitude * inverse_step + offset
+        if not 0.0 <= position <= last:
+            position = 0.0 if position < 0.0 else last
+        density_slope, density_intercept, sound_slope, sound_intercept = rows[int(position)]
+        return density_intercept + density_slope * position, sound_intercept + sound_slope * position
+
+
+ISA = Atmosphere()
+
+
+def _isa_conditions_at(altitude):
+    # Direct per-call evaluation, the baseline the tables are benchmarked against
+    temperature = SEA_LEVEL_TEMPERATURE + LAPSE_RATE * min(altitude, TROPOPAUSE)
+    pressure = SEA_LEVEL_PRESSURE * (temperature / SEA_LEVEL_TEMPERATURE) ** (
+        -STANDARD_GRAVITY / (LAPSE_RATE * GAS_CONSTANT))
+    if altitude > TROPOPAUSE:
+        pressure *= math.exp(-STANDARD_GRAVITY * (altitude - TROPOPAUSE) / (GAS_CONSTANT * temperature))
+    return pressure / (GAS_CONSTANT * temperature), math.sqrt(HEAT_CAPACITY_RATIO * GAS_CONSTANT * temperature)
+
+
+def benchmark(samples=1_000_000, seed=0):
+    """Print table build time and lookup throughput against direct ISA evaluation."""
+    start = time.perf_counter()
+    atmosphere = Atmosphere()
+    build = time.perf_counter() - start
+    print(f"Table build: {len(atmosphere.altitude)} altitudes in {build * 1000:.2f} ms")
+
+    altitudes = np.random.default_rng(seed).uniform(0, 15000, samples)
+    start = time.perf_counter()
+    atmosphere.conditions(altitudes)
+    table = time.perf_counter() - start
+    start = time.perf_counter()
+    temperature, pressure = isa_temperature_pressure(altitudes)
+    pressure / (GAS_CONSTANT * temperature)
+    np.sqrt(HEAT_CAPACITY_RATIO * GAS_CONSTANT * temperature)
+    direct = time.perf_counter() - start
+    print(f"Array lookups: {samples / table / 1e6:.1f} M/s (direct ISA: {samples / direct / 1e6:.1f} M/s)")
+
+    sample = altitudes[:samples // 10].tolist()
+    for name, lookup in (('Scalar lookups', atmosphere.conditions_at), ('direct ISA', _isa_conditions_at)):
+        start = time.perf_counter()
+        for altitude in sample:
+            lookup(altitude)
+        print(f"{name}: {len(sample) / (time.perf_counter() - start) / 1e6:.2f} M/s")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,140 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from bulletsim.trajectory import G, RHO, C_D, A, MASS, TIME_STEP, SPEED_OF_SOUND
+
+
+class BatchResult(NamedTuple):
+    range: np.ndarray  # Horizontal distance at the y = 0 crossing (m)
+    time_of_flight: np.ndarray  # Time of the y = 0 crossing (s)
+    impact_velocity: np.ndarray  # Speed at the y = 0 crossing (m/s)
+    paths: Optional[np.ndarray] = None  # (steps, 2, shots) x/y samples, NaN after impact
+
+
+def solve_batch(initial_velocity, launch_angle, mass=MASS, drag_coefficient=C_D, area=A,
+                time_step=TIME_STEP, max_time=1000.0, return_paths=False, drag_model=None,
+                atmosphere=None, altitude=0.0) -> BatchResult:
+    """Integrate many shots at once with the same Euler scheme as ``integrate_trajectory``.
+
+    Every argument except ``time_step``, ``max_time`` and ``return_paths`` may be a
+    scalar or an array; they are broadcast together to one shot per element. Shots
+    are dropped from the working set as soon as they cross y = 0, so the cost of a
+    step shrinks as the batch lands. Range, time of flight and impact speed are
+    linearly interpolated to the exact crossing between the last two samples. Shots
+    still airborne after ``max_time`` report NaN.
+
+    With a ``drag_model`` (see ``bulletsim.drag``) each shot's drag coefficient is
+    looked up from its Mach number every step and ``drag_coefficient`` is ignored,
+    as in ``integrate_trajectory``. Likewise an ``atmosphere`` supplies density and
+    speed of sound at each shot's height above ``altitude``.
+    """
+    velocity, angle, mass, drag_coefficient, area = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in
+          (initial_velocity, launch_angle, mass, drag_coefficient, area)))
+    shape = velocity.shape
+    n = velocity.size
+
+    out_range = np.full(n, np.nan)
+    out_time = np.full(n, np.nan)
+    out_speed = np.full(n, np.nan)
+
+    # Working set of shots that are still in the air, double-buffered as rows
+    # (x, y, vx, vy) so each step writes the next state without copying the last.
+    # Positions and velocities are updated as (2, n) pairs of rows, halving the
+    # number of ufunc calls per step.
+    index = np.arange(n)
+    if drag_model is not None:
+        drag_coefficient = np.ones_like(drag_coefficient)
+    rho = RHO if atmosphere is None else 1.0
+    kdt = (0.5 * rho * drag_coefficient * area / mass).ravel() * time_step
+    gdt = G * time_step
+    cur = np.zeros((4, n))
+    cur[2] = (velocity * np.cos(angle)).ravel()
+    cur[3] = (velocity * np.sin(angle)).ravel()
+    nxt = np.empty_like(cur)
+    tmp = np.empty((2, n))
+    scale = np.empty(n)
+    parked = 0
+
+    paths = [] if return_paths else None
+    time = 0.0
+    steps = int(np.ceil(max_time / time_step))
+
+    for _ in range(steps):
+        if index.size == parked:
+            break
+
+        if paths is not None:
+            sample = np.full((2, n), np.nan)
+            sample[:, index] = cur[:2]
+            paths.append(sample)
+
+        x, y, vx, vy = cur
+        next_x, next_y, next_vx, next_vy = nxt
+        scratch = tmp[0]
+
+        # Scale the per-shot drag by density and Cd(Mach) when they vary; next_x and
+        # next_y are free scratch until the position update below writes them
+        step_kdt = kdt
+        speed_of_sound = SPEED_OF_SOUND
+        if atmosphere is not None:
+            np.add(y, altitude, out=next_y)
+            rho, speed_of_sound = atmosphere.conditions(next_y, out_density=scale, out_speed_of_sound=next_y)
+            step_kdt = np.multiply(rho, kdt, out=scale)
+        if drag_model is not None:
+            np.multiply(vx, vx, out=next_x)
+            np.multiply(vy, vy, out=scratch)
+            next_x += scratch
+            np.sqrt(next_x, out=next_x)
+            next_x /= speed_of_sound
+            cd = drag_model(next_x, out=next_x)
+            step_kdt = np.multiply(step_kdt, cd, out=scale)
+
+        # Same update as integrate_trajectory: velocities first, then positions
+        velocity, next_velocity = cur[2:], nxt[2:]
+        np.multiply(velocity, velocity, out=tmp)
+        tmp *= step_kdt
+        tmp[1] += gdt
+        np.subtract(velocity, tmp, out=next_velocity)
+        np.multiply(next_velocity, time_step, out=tmp)
+        np.add(cur[:2], tmp, out=nxt[:2])
+        time += time_step
+
+        # Indices rather than a mask: a handful of shots land per step, so every
+        # gather and scatter below touches only those instead of rescanning all n
+        landed = np.flatnonzero(next_y < 0)
+        if landed.size:
+            # Interpolate to the y = 0 crossing between the previous and current sample
+            before = cur[:, landed]
+            after = nxt[:, landed]
+            frac = before[1] / (before[1] - after[1])
+            crossing = before + frac * (after - before)
+            hit = index[landed]
+            out_range[hit] = crossing[0]
+            out_time[hit] = time - time_step + frac * time_step
+            out_speed[hit] = np.hypot(crossing[2], crossing[3])
+
+            # Park landed shots at NaN so they never test as landed again and drop
+            # out of the paths, and only pay for compaction once they make up half
+            # of the working set
+            nxt[:2, landed] = np.nan
+            nxt[2:, landed] = 0.0
+            kdt[landed] = 0.0
+            parked += hit.size
+            if 2 * parked >= index.size:
+                flying = ~np.isnan(nxt[1])
+                index, kdt = index[flying], kdt[flying]
+                cur = nxt[:, flying]
+                nxt = np.empty_like(cur)
+                tmp = tmp[:, :index.size]
+                scale = scale[:index.size]
+                parked = 0
+                continue
+
+        cur, nxt = nxt, cur
+
+    if paths is not None:
+        paths = np.stack(paths).reshape((len(paths), 2) + shape) if paths else np.empty((0, 2) + shape)
+
+    return BatchResult(out_range.reshape(shape), out_time.reshape(shape), out_speed.reshape(shape), paths)
@@ -0,0 +1,237 @@
+"""Headless batch solver: ``bulletsim-batch shots.csv -o results.csv``.
+
+Reads shots from CSV (with a header row) or JSON lines, one shot per row/line.
+``velocity`` (m/s) and ``angle`` (degrees, or radians with ``--radians``) are
+required; ``mass``, ``drag_coefficient`` and ``area`` fall back to the
+``bulletsim.trajectory`` defaults when absent or empty. Nothing here imports a GUI
+toolkit.
+"""
+import argparse
+import csv
+import functools
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from bulletsim.atmosphere import Atmosphere
+from bulletsim.batch import solve_batch
+from bulletsim.drag import DRAG_MODELS
+from bulletsim.trajectory import C_D, A, MASS, TIME_STEP
+
+CHUNK_SIZE = 8192
+INPUTS = ('velocity', 'angle', 'mass', 'drag_coefficient', 'area')
+DEFAULTS = {'mass': MASS, 'drag_coefficient': C_D, 'area': A}
+OUTPUTS = ('range', 'time_of_flight', 'impact_velocity')
+COLUMNS = ('shot',) + INPUTS + OUTPUTS
+
+
+def _read_rows(file, input_format):
+    if input_format == 'csv':
+        yield from csv.DictReader(file)
+        return
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _value(row, name, number):
+    value = row.get(name)
+    if value is None or value == '':
+        if name not in DEFAULTS:
+            raise ValueError(f"shot {number}: missing {name!r}")
+        return DEFAULTS[name]
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"shot {number}: {name} is not a number: {value!r}") from None
+
+
+def read_chunks(file, input_format='csv', chunk_size=CHUNK_SIZE):
+    """Yield ``(first_shot, columns)`` with one float64 array per ``INPUTS`` name."""
+    rows = _read_rows(file, input_format)
+    first = 0
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        columns = {name: np.array([_value(row, name, first + i) for i, row in enumerate(chunk)])
+                   for name in INPUTS}
+        yield first, columns
+        first += len(chunk)
+
+
+@functools.lru_cache(maxsize=None)
+def _atmosphere(temperature_offset):
+    return Atmosphere(temperature_offset=temperature_offset)
+
+
+def _solve_chunk(task):
+    first, columns, options = task
+    drag, temperature_offset, altitude, radians, time_step, max_time = options
+    angle = columns['angle'] if radians else np.radians(columns['angle'])
+    result = solve_batch(columns['velocity'], angle, columns['mass'], columns['drag_coefficient'],
+                         columns['area'], time_step=time_step, max_time=max_time,
+                         drag_model=DRAG_MODELS[drag] if drag else None,
+                         atmosphere=None if temperature_offset is None else _atmosphere(temperature_offset),
+                         altitude=altitude)
+    columns = dict(columns, shot=np.arange(first, first + len(angle), dtype=np.float64))
+    columns.update(zip(OUTPUTS, result[:len(OUTPUTS)]))
+    return columns
+
+
+class CsvWriter:
+    """Results as CSV text, one row per shot."""
+
+    def __init__(self, file):
+        self._writer = csv.writer(file)
+        self._writer.writerow(COLUMNS)
+
+    def write(self, columns):
+        shots = columns['shot'].astype(np.int64).tolist()
+        values = [columns[name].tolist() for name in COLUMNS[1:]]
+        self._writer.writerows(zip(shots, *values))
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
+
+
+class ColumnWriter:
+    """Results as a directory of raw little-endian float64 files, one per column.
+
+    ``columns.json`` records the column names, dtype and row count, and is only
+    written by ``close`` once every shot is solved: a directory without it holds
+    an unfinished run. Read a column back with
+    ``np.fromfile(directory / 'range.f8', '<f8')``.
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.rows = 0
+        # A manifest left by an earlier run would describe columns about to be overwritten
+        self._manifest = os.path.join(directory, 'columns.json')
+        if os.path.exists(self._manifest):
+            os.remove(self._manifest)
+        self._files = {name: open(os.path.join(directory, f"{name}.f8"), 'wb') for name in COLUMNS}
+
+    def write(self, columns):
+        for name, handle in self._files.items():
+            columns[name].astype('<f8', copy=False).tofile(handle)
+        self.rows += len(columns['shot'])
+
+    def close(self):
+        self.abort()
+        with open(self._manifest, 'w') as file:
+            json.dump({'columns': list(COLUMNS), 'dtype': '<f8', 'rows': self.rows}, file)
+
+    def abort(self):
+        """Close the column files without writing the manifest, after a failed run."""
+        for handle in self._files.values():
+            handle.close()
+
+
+def _format(path, explicit, choices):
+    if explicit:
+        return explicit
+    extension = os.path.splitext(path)[1].lower()
+    return choices.get(extension, next(iter(choices.values())))
+
+
+def run(input_file, output, input_format='csv', output_format='csv', processes=None, chunk_size=CHUNK_SIZE,
+        drag=None, temperature_offset=None, altitude=0.0, radians=False, time_step=TIME_STEP, max_time=1000.0,
+        progress=sys.stderr):
+    """Solve every shot in ``input_file`` and stream the results to ``output``.
+
+    Chunks of ``chunk_size`` shots are solved with ``solve_batch`` on a pool of
+    ``processes`` workers (inline when 1) and written back in input order as they
+    complete. Returns ``(shots, seconds)``. If anything fails part way, the
+    writer is aborted rather than closed, so a columns directory gets no manifest.
+    """
+    options = (drag, temperature_offset, altitude, radians, time_step, max_time)
+    tasks = ((first, columns, options) for first, columns in read_chunks(input_file, input_format, chunk_size))
+    writer = CsvWriter(output) if output_format == 'csv' else ColumnWriter(output)
+
+    shots = 0
+    start = time.perf_counter()
+    pool = None if processes == 1 else multiprocessing.Pool(processes)
+    try:
+        results = map(_solve_chunk, tasks) if pool is None else pool.imap(_solve_chunk, tasks)
+        for columns in results:
+            writer.write(columns)
+            shots += len(columns['shot'])
+            if progress is not None:
+                elapsed = time.perf_counter() - start
+                progress.write(f"\r{shots} shots, {shots / elapsed:,.0f} shots/s")
+                progress.flush()
+    except BaseException:
+        if pool is not None:
+            pool.terminate()
+        writer.abort()
+        raise
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    writer.close()
+
+    elapsed = time.perf_counter() - start
+    if progress is not None:
+        progress.write(f"\r{shots} shots in {elapsed:.2f} s ({shots / max(elapsed, 1e-9):,.0f} shots/s)\n")
+    return shots, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='bulletsim-batch', description=__doc__.splitlines()[0])
+    parser.add_argument('input', help="shot list (.csv or .jsonl), '-' for stdin")
+    parser.add_argument('-o', '--output', default='-',
+                        help="results file, '-' for stdout, or a directory with --output-format columns")
+    parser.add_argument('--input-format', choices=('csv', 'jsonl'))
+    parser.add_argument('--output-format', choices=('csv', 'columns'))
+    parser.add_argument('-j', '--processes', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--drag', choices=sorted(DRAG_MODELS), help="Mach-dependent drag table")
+    parser.add_argument('--atmosphere', action='store_true', help="ISA density and speed of sound by height")
+    parser.add_argument('--temperature-offset', type=float, default=0.0, help="ISA + dT in K (with --atmosphere)")
+    parser.add_argument('--altitude', type=float, default=0.0, help="launch altitude in m (with --atmosphere)")
+    parser.add_argument('--radians', action='store_true', help="angles are in radians, not degrees")
+    parser.add_argument('--time-step', type=float, default=TIME_STEP)
+    parser.add_argument('--max-time', type=float, default=1000.0)
+    parser.add_argument('-q', '--quiet', action='store_true', help="no progress on stderr")
+    args = parser.parse_args(argv)
+
+    input_format = _format(args.input, args.input_format, {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'})
+    output_format = args.output_format or ('csv' if args.output == '-' or args.output.endswith('.csv') else 'columns')
+    if output_format == 'columns' and args.output == '-':
+        parser.error("--output-format columns needs an output directory")
+
+    input_file = sys.stdin if args.input == '-' else open(args.input, newline='')
+    output = args.output
+    if output_format == 'csv':
+        output = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    try:
+        run(input_file, output, input_format, output_format, args.processes, args.chunk_size, args.drag,
+            args.temperature_offset if args.atmosphere else None, args.altitude, args.radians,
+            args.time_step, args.max_time, progress=None if args.quiet else sys.stderr)
+    except ValueError as error:
+        # Malformed shots are the input's fault, not ours; report them without a traceback
+        parser.exit(1, f"\n{parser.prog}: error: {error}\n")
+    except KeyboardInterrupt:
+        parser.exit(130, f"\n{parser.prog}: interrupted\n")
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_format == 'csv' and output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
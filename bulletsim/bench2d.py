@@ -0,0 +1,119 @@
+"""Headless 2D scenario benchmark: ``python -m bulletsim.bench2d --bullets-per-second 30 --cubes 20``."""
+import argparse
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from typing import NamedTuple
+
+import numpy as np
+
+from bulletsim.sim2d import BLUE, RED, World
+from bulletsim.timestep import STEP
+
+
+class BenchmarkResult(NamedTuple):
+    steps: int
+    seconds: float  # Wall time spent stepping
+    steps_per_second: float
+    p50_ms: float  # Median step time
+    p99_ms: float
+    max_ms: float
+    peak_rss_mb: float  # Peak resident size of the whole process so far
+    peak_memory_mb: float  # Peak traced Python allocation, NaN unless trace_memory
+    bullets_fired: int
+    hits: int
+    cubes: int  # Cubes and fragments alive at the end
+    active_cubes: int
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def build_scenario(cubes=10, seed=0):
+    """A world with ``cubes`` wooden and glass cubes scattered over the right two thirds of the screen."""
+    world = World(seed=seed)
+    layout = random.Random(seed)
+    for i in range(cubes):
+        size = layout.randint(20, 100)
+        x = layout.uniform(world.width / 3, world.width - size / 2)
+        y = layout.uniform(size / 2, world.height - size / 2)
+        if i % 2:
+            world.add_cube(x, y, size, BLUE, 0.5)
+        else:
+            world.add_cube(x, y, size, RED, 1.0)
+    return world
+
+
+def run_scenario(bullets_per_second=30.0, cubes=10, seconds=10.0, seed=0, substeps=1, speed=(10.0, 40.0),
+                 spin_rate=0.0, trace_memory=False) -> BenchmarkResult:
+    """Fire ``bullets_per_second`` from the left edge into ``cubes`` cubes for ``seconds`` of game time.
+
+    Every 1/60 s step is timed on its own. Shots are drawn from ``seed`` in game time,
+    so the workload is identical from run to run and machine to machine.
+    ``trace_memory`` turns on ``tracemalloc`` to report peak Python memory, which
+    slows every allocation, so step times from such a run are not comparable.
+    """
+    world = build_scenario(cubes, seed)
+    shots = random.Random(seed + 1)
+    steps = int(round(seconds / STEP))
+    per_step = bullets_per_second * STEP
+    dt = 1.0 / substeps
+    times = np.empty(steps)
+    owed = 0.0
+    fired = 0
+
+    if trace_memory:
+        tracemalloc.start()
+    clock = time.perf_counter
+    try:
+        for i in range(steps):
+            owed += per_step
+            start = clock()
+            while owed >= 1.0:
+                world.fire(shots.uniform(0, 50), shots.uniform(50, world.height - 50), shots.uniform(*speed),
+                           spin_rate)
+                owed -= 1.0
+                fired += 1
+            world.begin_step()
+            for _ in range(substeps):
+                world.step(dt)
+            times[i] = clock() - start
+        peak = tracemalloc.get_traced_memory()[1] / 2**20 if trace_memory else float('nan')
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    total = float(times.sum())
+    p50, p99 = np.percentile(times, (50, 99)) * 1000 if steps else (float('nan'),) * 2
+    return BenchmarkResult(steps, total, steps / total if total else float('nan'), float(p50), float(p99),
+                           float(times.max() * 1000) if steps else float('nan'), _peak_rss_mb(), peak, fired, world.hits,
+                           len(world.cubes), len(world.active_cubes))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bullets-per-second', type=float, default=30.0)
+    parser.add_argument('--cubes', type=int, default=10)
+    parser.add_argument('--seconds', type=float, default=10.0, help="game time to simulate")
+    parser.add_argument('--substeps', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--trace-memory', action='store_true', help="report peak memory (slows the run)")
+    args = parser.parse_args(argv)
+
+    result = run_scenario(args.bullets_per_second, args.cubes, args.seconds, args.seed, args.substeps,
+                          trace_memory=args.trace_memory)
+    print(f"{result.steps} steps in {result.seconds:.3f} s: {result.steps_per_second:,.0f} steps/s")
+    print(f"step time: p50 {result.p50_ms:.3f} ms, p99 {result.p99_ms:.3f} ms, max {result.max_ms:.3f} ms")
+    print(f"peak RSS: {result.peak_rss_mb:.1f} MiB", end="")
+    print(f", peak traced Python memory: {result.peak_memory_mb:.2f} MiB" if args.trace_memory else "")
+    print(f"{result.bullets_fired} bullets fired, {result.hits} hits, "
+          f"{result.cubes} cubes ({result.active_cubes} awake) at the end")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+CELL_SIZE = 64
+
+
+class SpatialHash:
+    """Uniform-grid broadphase over objects with a pygame-style ``rect``.
+
+    ``rebuild`` buckets every object into the ``cell_size`` cells its rect
+    overlaps; ``query`` returns only the objects sharing a cell with a rect, so the
+    exact overlap test runs on nearby candidates instead of on every pair. Counts
+    since the last rebuild are kept for comparison with the brute-force loop:
+    ``candidate_pairs`` were handed out by ``query``, ``naive_pairs`` is what
+    testing every query against every object would have cost.
+
+    Objects that rarely move can instead be added and removed one at a time with
+    ``insert`` and ``remove``, so a grid of them never needs a full rebuild.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self._inserted = {}
+        self.size = 0
+        self.candidate_pairs = 0
+        self.naive_pairs = 0
+
+    def _cells(self, rect):
+        size = self.cell_size
+        # right/bottom are exclusive in pygame, hence the - 1
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield cx, cy
+
+    def rebuild(self, objects):
+        """Replace the contents of the grid with ``objects`` and reset the pair counts."""
+        cells = self.cells = {}
+        self._inserted = {}
+        self.size = 0
+        for obj in objects:
+            for cell in self._cells(obj.rect):
+                bucket = cells.get(cell)
+                if bucket is None:
+                    cells[cell] = [obj]
+                else:
+                    bucket.append(obj)
+            self.size += 1
+        self.reset_counts()
+
+    def insert(self, obj):
+        """Add one object under the cells its rect covers now."""
+        cells = self._inserted[obj] = list(self._cells(obj.rect))
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(obj)
+        self.size += 1
+
+    def remove(self, obj):
+        """Take out an object added with ``insert``, even if its rect has changed since."""
+        for cell in self._inserted.pop(obj):
+            bucket = self.cells[cell]
+            bucket.remove(obj)
+            if not bucket:
+                del self.cells[cell]
+        self.size -= 1
+
+    def reset_counts(self):
+        self.candidate_pairs = 0
+        self.naive_pairs = 0
+
+    def query(self, rect):
+        """Objects that may overlap ``rect``, each once, in insertion order per cell."""
+        found = {}
+        cells = self.cells
+        for cell in self._cells(rect):
+            bucket = cells.get(cell)
+            if bucket is not None:
+                found.update(dict.fromkeys(bucket))
+        self.candidate_pairs += len(found)
+        self.naive_pairs += self.size
+        return list(found)
@@ -0,0 +1,97 @@
+import numpy as np
+
+from bulletsim.fragment_store import FLOOR, swap_remove
+
+MAX_BULLETS = 256
+MAX_RANGE = 100.0  # Metres from the muzzle
+TIME_TO_LIVE = 5.0  # Seconds
+BOUNDS = 50.0  # Half-width of the 100 x 100 floor
+_FIELDS = ('position', 'start', 'velocity', 'direction', 'initial_position', 'radius', 'mass', 'age')
+
+
+class BulletManager:
+    """Live 3dbullet.py bullets in a fixed-capacity pool of arrays.
+
+    Rows ``0 .. len(manager) - 1`` are live and each bullet occupies exactly one
+    row, so it is stepped once per frame however many targets it hits. ``cull``
+    drops bullets older than ``time_to_live``, further than ``max_range`` from
+    where they were fired, or off the floor: beyond ``bounds`` in x or z, or
+    fallen through it. The arrays are allocated once; firing into a full pool
+    replaces the oldest bullet, so per-frame work never grows past ``capacity``.
+    """
+
+    def __init__(self, capacity=MAX_BULLETS, max_range=MAX_RANGE, time_to_live=TIME_TO_LIVE, bounds=BOUNDS,
+                 floor=FLOOR):
+        self.capacity = capacity
+        self.max_range = max_range
+        self.time_to_live = time_to_live
+        self.bounds = bounds
+        self.floor = floor
+        self.count = 0
+        self.position = np.empty((capacity, 3))
+        self.start = np.empty((capacity, 3))  # Position before the last ``step``, for swept collision
+        self.velocity = np.empty((capacity, 3))
+        self.direction = np.empty((capacity, 3))
+        self.initial_position = np.empty((capacity, 3))
+        self.radius = np.empty(capacity)
+        self.mass = np.empty(capacity)
+        self.age = np.empty(capacity)
+        self.culled = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return self.count
+
+    def fire(self, position, direction, radius, mass, speed):
+        """Add a bullet fired from ``position`` along ``direction``; returns its row."""
+        if self.count == self.capacity:
+            self.release(int(np.argmax(self.age[:self.count])))
+            self.evicted += 1
+        slot = self.count
+        self.count += 1
+        self.position[slot] = position
+        self.start[slot] = position
+        self.initial_position[slot] = position
+        self.direction[slot] = direction
+        self.velocity[slot] = np.multiply(direction, speed)
+        self.radius[slot] = radius
+        self.mass[slot] = mass
+        self.age[slot] = 0.0
+        return slot
+
+    def release(self, slot):
+        """Remove the bullet in ``slot``, filling the gap with the last live bullet."""
+        last = self.count - 1
+        if slot != last:
+            for name in _FIELDS:
+                array = getattr(self, name)
+                array[slot] = array[last]
+        self.count = last
+
+    def step(self, dt, gravity, air_resistance):
+        """Advance every bullet by ``dt`` seconds, losing ``air_resistance`` of its velocity."""
+        n = self.count
+        if n == 0:
+            return
+        self.start[:n] = self.position[:n]
+        velocity = self.velocity[:n]
+        velocity[:, 1] += gravity * dt
+        self.position[:n] += velocity * dt
+        velocity *= 1 - air_resistance
+        self.age[:n] += dt
+
+    def cull(self):
+        """Drop expired, out-of-range and out-of-bounds bullets; returns how many went."""
+        n = self.count
+        position = self.position[:n]
+        travelled = position - self.initial_position[:n]
+        gone = ((self.age[:n] > self.time_to_live)
+                | (np.einsum('ij,ij->i', travelled, travelled) > self.max_range ** 2)
+                | (np.abs(position[:, 0]) > self.bounds) | (np.abs(position[:, 2]) > self.bounds)
+                | (position[:, 1] + self.radius[:n] < self.floor))
+        self.count = swap_remove([getattr(self, name) for name in _FIELDS], n, gone)
+        self.culled += n - self.count
+        return n - self.count
+
+    def clear(self):
+        self.count = 0
@@ -0,0 +1,127 @@
+import math
+
+import numpy as np
+
+from bulletsim.forces import bullet_acceleration
+
+BULLET_MASS = 0.05
+BULLET_SIZE = 10
+_FIELDS = ('position', 'previous', 'start', 'velocity', 'angle', 'mass', 'shape', 'drag_coefficient', 'angular_velocity')
+
+
+class BulletPool:
+    """Live 2dbullet.py bullets kept as contiguous arrays and stepped together.
+
+    Slots ``0 .. len(pool) - 1`` are live. Removing a bullet moves the last one into
+    its slot, so the arrays stay dense and a frame is one ``bullet_acceleration``
+    call over ``[:len(pool)]``. Each slot may carry an ``owner`` (e.g. the sprite
+    that draws it) whose ``slot`` attribute is kept current when bullets move and
+    set to None once its bullet is released.
+    """
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.position = np.empty((capacity, 2))
+        self.previous = np.empty((capacity, 2))  # Position at the start of the last fixed step
+        self.start = np.empty((capacity, 2))  # Position before the last ``step`` call, for swept collision
+        self.velocity = np.empty((capacity, 2))
+        self.angle = np.empty(capacity)
+        self.mass = np.empty(capacity)
+        self.shape = np.empty(capacity)
+        self.drag_coefficient = np.empty(capacity)
+        self.angular_velocity = np.empty(capacity)
+        self.owners = [None] * capacity
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        capacity = 2 * len(self.angle)
+        for name in _FIELDS:
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:])
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.owners.extend([None] * (capacity - len(self.owners)))
+
+    def spawn(self, x, y, angle, speed, shape, drag_coefficient, spin_rate, mass=BULLET_MASS, owner=None):
+        """Add a bullet fired from ``(x, y)`` at ``angle`` degrees; returns its slot."""
+        if self.count == len(self.angle):
+            self._grow()
+        slot = self.count
+        self.count += 1
+        radians = math.radians(angle)
+        self.position[slot] = (x, y)
+        self.previous[slot] = (x, y)
+        self.start[slot] = (x, y)
+        self.velocity[slot] = (math.cos(radians) * speed, -math.sin(radians) * speed)
+        self.angle[slot] = radians
+        self.mass[slot] = mass
+        self.shape[slot] = shape
+        self.drag_coefficient[slot] = drag_coefficient
+        self.angular_velocity[slot] = spin_rate * shape / 2  # Constant angular velocity, as in Bullet
+        self.owners[slot] = owner
+        if owner is not None:
+            owner.slot = slot
+        return slot
+
+    def release(self, slot):
+        """Remove the bullet in ``slot``, filling the gap with the last live bullet."""
+        last = self.count - 1
+        released = self.owners[slot]
+        if released is not None:
+            released.slot = None
+        if slot != last:
+            for name in _FIELDS:
+                array = getattr(self, name)
+                array[slot] = array[last]
+            owner = self.owners[slot] = self.owners[last]
+            if owner is not None:
+                owner.slot = slot
+        self.owners[last] = None
+        self.count = last
+
+    def snapshot(self):
+        """Remember the current positions as ``previous``, for render interpolation."""
+        self.previous[:self.count] = self.position[:self.count]
+
+    def step(self, air_density, wind_speed, wind_direction, latitude, width=None, height=None, dt=1.0):
+        """Advance every live bullet by ``dt`` frames, as ``Bullet.update`` did one frame at a time.
+
+        Accelerations are per frame, so a ``dt`` below one is a substep of a frame.
+        Given a ``width`` and ``height``, also ``cull`` to that screen and return what
+        it removed.
+        """
+        n = self.count
+        if n == 0:
+            return []
+        self.start[:n] = self.position[:n]
+        position = self.position[:n]
+        velocity = self.velocity[:n]
+        acceleration = bullet_acceleration(velocity, self.mass[:n], self.drag_coefficient[:n], self.shape[:n],
+                                           self.angular_velocity[:n], air_density, wind_speed, wind_direction,
+                                           latitude)
+        if dt != 1.0:
+            acceleration *= dt
+        velocity += acceleration
+        position += velocity if dt == 1.0 else velocity * dt
+
+        if width is None:
+            return []
+        return self.cull(width, height)
+
+    def cull(self, width, height):
+        """Release bullets whose ``BULLET_SIZE`` box has left the ``width`` x ``height`` screen.
+
+        Their owners are returned so the caller can drop their sprites.
+        """
+        half = BULLET_SIZE / 2
+        x = self.position[:self.count, 0]
+        y = self.position[:self.count, 1]
+        gone = np.flatnonzero((x < -half) | (x > width + half) | (y < -half) | (y > height + half))
+        removed = []
+        # Highest slot first, so the bullet swapped into a freed slot is never one still to be removed
+        for slot in gone[::-1].tolist():
+            removed.append(self.owners[slot])
+            self.release(slot)
+        return removed
@@ -0,0 +1,88 @@
+import numpy as np
+
+MAX_POINTS = 2000
+
+
+def lttb(x, y, max_points=MAX_POINTS):
+    """Indices of at most ``max_points`` samples chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last samples are always kept. The interior is split into equal
+    buckets and each contributes the sample forming the largest triangle with the
+    previously kept sample and the mean of the next bucket, which keeps the visual
+    shape of the curve far better than striding.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if max_points >= n or n <= 2:
+        return np.arange(n)
+    if max_points < 3:
+        return np.array([0, n - 1])[:max(max_points, 0)]
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+    # Mean of each bucket, with the last sample standing in for the bucket after the final one
+    counts = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[:-1], edges[:-1]) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(y[:-1], edges[:-1]) / counts, y[-1])
+
+    selected = np.empty(max_points, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        bx = x[start:stop]
+        by = y[start:stop]
+        px, py = x[previous], y[previous]
+        # Twice the triangle area; the constant factor doesn't change the argmax
+        area = np.abs((px - mean_x[bucket + 1]) * (by - py) - (px - bx) * (mean_y[bucket + 1] - py))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def min_max(x, y, max_points=MAX_POINTS):
+    """Indices of at most ``max_points`` samples keeping each bucket's lowest and highest ``y``.
+
+    Cheaper than ``lttb`` and fully vectorized; it never clips a peak, at the cost of
+    a slightly jagged line when buckets hold long monotonic runs.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if max_points >= n or n <= 2:
+        return np.arange(n)
+
+    buckets = max((max_points - 2) // 2, 1)
+    size = -(-(n - 2) // buckets)
+    interior = y[1:n - 1]
+    padded = np.pad(interior, (0, buckets * size - len(interior)), mode='edge').reshape(buckets, size)
+    offsets = 1 + size * np.arange(buckets)
+    low = np.minimum(offsets + padded.argmin(axis=1), n - 2)
+    high = np.minimum(offsets + padded.argmax(axis=1), n - 2)
+    return np.unique(np.concatenate(([0, n - 1], low, high)))
+
+
+METHODS = {'lttb': lttb, 'minmax': min_max}
+
+
+def decimate(x, y, max_points=MAX_POINTS, method='lttb'):
+    """``(x, y)`` reduced to at most ``max_points`` samples for plotting.
+
+    ``method`` is ``'lttb'`` or ``'minmax'``. The launch point, the apex (highest
+    ``y``) and the impact point (last sample) always survive, so ``max_points``
+    must be at least 3.
+    """
+    if max_points < 3:
+        raise ValueError(f"max_points must be at least 3 to keep launch, apex and impact, not {max_points}")
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) <= max_points:
+        return x, y
+    keep = [0, int(np.argmax(y)), len(x) - 1]
+    if max_points == 3:
+        # No room for anything else; min_max would still return a bucket's low and high
+        index = np.unique(keep)
+    else:
+        # Leave one slot for the apex in case the bucketing passes over it
+        index = np.union1d(METHODS[method](x, y, max_points - 1), keep)
+    return x[index], y[index]
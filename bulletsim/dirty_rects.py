@@ -0,0 +1,58 @@
+class DirtyRectRenderer:
+    """Draws a frame by touching only the screen regions that changed since the last one.
+
+    ``draw`` takes the whole scene each frame as ``(key, image, rect)`` items in
+    back-to-front order, where ``key`` identifies an item across frames (its sprite,
+    say). Items that moved, changed image or disappeared mark their old and new
+    rects dirty. Each dirty rect is erased to ``background`` and redrawn, clipped to
+    it, from every item it overlaps; nothing else on the surface is touched. The
+    returned rects are the regions to pass to ``pygame.display.update``. Works with any pygame-compatible surface and
+    rect types.
+    """
+
+    def __init__(self, background):
+        self.background = background
+        self._drawn = {}
+        self._full = True
+
+    def invalidate(self):
+        """Redraw the whole surface on the next ``draw``, e.g. after something else drew on it."""
+        self._full = True
+
+    def draw(self, surface, items):
+        previous = self._drawn
+        drawn = self._drawn = {}
+
+        if self._full:
+            self._full = False
+            surface.fill(self.background)
+            for key, image, rect in items:
+                drawn[key] = (image, rect, surface.blit(image, rect))
+            return [surface.get_rect()]
+
+        items = list(items)
+        dirty = []
+        for key, image, rect in items:
+            last = previous.pop(key, None)
+            if last is not None and last[0] is image and last[1] == rect:
+                drawn[key] = last
+                continue
+            if last is not None:
+                dirty.append(last[2])
+            dirty.append(rect)
+            drawn[key] = (image, rect, rect.clip(surface.get_rect()))
+        # Whatever disappeared since the last frame leaves a hole to erase
+        dirty.extend(last[2] for last in previous.values())
+
+        # Each dirty rect is erased and rebuilt from every item over it, clipped to it, so no pixel
+        # outside the returned rects changes and translucent images never blend onto themselves
+        rects = [rect for _, _, rect in items]
+        clip = surface.get_clip()
+        for area in dirty:
+            surface.set_clip(area)
+            surface.fill(self.background, area)
+            for index in area.collidelistall(rects):
+                _, image, rect = items[index]
+                surface.blit(image, rect)
+        surface.set_clip(clip)
+        return dirty
@@ -0,0 +1,125 @@
+import math
+import multiprocessing
+from typing import NamedTuple
+
+import numpy as np
+
+from bulletsim.forces import bullet_acceleration
+
+CHUNK_SIZE = 65536
+
+
+class ShotSpread(NamedTuple):
+    """Nominal 2dbullet.py shot inputs and how much each one varies from shot to shot.
+
+    ``*_sd`` fields are normal standard deviations; ``angle_spread`` is the half-width
+    in degrees of the uniform aim jitter the game applies to every shot.
+    """
+    muzzle_velocity: float = 10.0
+    muzzle_velocity_sd: float = 0.0
+    angle_spread: float = 5.0
+    air_density: float = 1.0
+    air_density_sd: float = 0.0
+    wind_speed: float = 1.0
+    wind_speed_sd: float = 0.0
+    wind_direction: float = 0.0  # radians
+    wind_direction_sd: float = 0.0
+    drag_coefficient: float = 0.3
+    drag_coefficient_sd: float = 0.0
+    mass: float = 0.05
+    shape: float = 0.01
+    spin_rate: float = 0.0
+    latitude: float = 0.0  # radians
+
+
+class DispersionResult(NamedTuple):
+    impacts: np.ndarray  # Impact height on the target plane per shot (screen y, down positive), NaN on a miss
+    mean_point_of_impact: float
+    cep: float  # Radius about the mean point of impact holding 50% of the hits
+    r95: float  # Radius about the mean point of impact holding 95% of the hits
+    hit_fraction: float  # Shots that reached the target plane
+    histogram: np.ndarray
+    bin_edges: np.ndarray
+
+
+def _simulate_chunk(task):
+    spread, count, seed, target_distance, floor, max_steps = task
+    rng = np.random.default_rng(seed)
+
+    def sample(mean, sd):
+        return mean + sd * rng.standard_normal(count) if sd else np.full(count, float(mean))
+
+    speed = sample(spread.muzzle_velocity, spread.muzzle_velocity_sd)
+    angle = np.radians(rng.uniform(-spread.angle_spread, spread.angle_spread, count))
+    air_density = sample(spread.air_density, spread.air_density_sd)
+    wind_speed = sample(spread.wind_speed, spread.wind_speed_sd)
+    wind_direction = sample(spread.wind_direction, spread.wind_direction_sd)
+    drag_coefficient = sample(spread.drag_coefficient, spread.drag_coefficient_sd)
+    angular_velocity = spread.spin_rate * spread.shape / 2
+
+    # Same frame update as Bullet.update: velocity += acceleration, position += velocity
+    position = np.zeros((count, 2))
+    velocity = np.stack([np.cos(angle) * speed, -np.sin(angle) * speed], axis=1)
+    impacts = np.full(count, np.nan)
+    index = np.arange(count)
+
+    for _ in range(max_steps):
+        if index.size == 0:
+            break
+        acceleration = bullet_acceleration(velocity, spread.mass, drag_coefficient, spread.shape,
+                                           angular_velocity, air_density, wind_speed, wind_direction,
+                                           spread.latitude)
+        velocity += acceleration
+        previous = position.copy()
+        position += velocity
+
+        crossed = position[:, 0] >= target_distance
+        if crossed.any():
+            before, after = previous[crossed], position[crossed]
+            fraction = (target_distance - before[:, 0]) / (after[:, 0] - before[:, 0])
+            impacts[index[crossed]] = before[:, 1] + fraction * (after[:, 1] - before[:, 1])
+
+        # Drop shots that hit the plane, fell through the floor or stopped moving downrange
+        keep = ~crossed & (position[:, 1] <= floor) & (velocity[:, 0] > 0)
+        if not keep.all():
+            index = index[keep]
+            position = position[keep]
+            velocity = velocity[keep]
+            air_density = air_density[keep]
+            wind_speed = wind_speed[keep]
+            wind_direction = wind_direction[keep]
+            drag_coefficient = drag_coefficient[keep]
+    return impacts
+
+
+def simulate_dispersion(shots, spread=ShotSpread(), target_distance=400.0, floor=600.0, max_steps=10000,
+                        seed=0, processes=None, chunk_size=CHUNK_SIZE, bins=64) -> DispersionResult:
+    """Fire ``shots`` randomized 2dbullet.py shots at a vertical target plane, headless.
+
+    Shots start at the origin in screen units (pixels, y down) and hit when they
+    reach ``x = target_distance``; falling below ``y = floor`` or losing all forward
+    speed is a miss. Shots are split into chunks of ``chunk_size`` integrated
+    together, and chunks run on a ``multiprocessing`` pool of ``processes`` workers
+    (inline when 1). Each chunk draws from its own ``SeedSequence`` child of
+    ``seed``, so results depend only on ``seed`` and ``chunk_size``, never on the
+    worker count or scheduling.
+    """
+    counts = [min(chunk_size, shots - start) for start in range(0, shots, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+    tasks = [(spread, count, child, target_distance, floor, max_steps) for count, child in zip(counts, seeds)]
+
+    if processes == 1 or len(tasks) <= 1:
+        chunks = [_simulate_chunk(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            chunks = pool.map(_simulate_chunk, tasks)
+    impacts = np.concatenate(chunks) if chunks else np.empty(0)
+
+    hits = impacts[~np.isnan(impacts)]
+    histogram, bin_edges = np.histogram(hits, bins=bins)
+    if hits.size:
+        mean_point = float(hits.mean())
+        cep, r95 = (float(value) for value in np.percentile(np.abs(hits - mean_point), (50, 95)))
+    else:
+        mean_point = cep = r95 = math.nan
+    return DispersionResult(impacts, mean_point, cep, r95, hits.size / max(shots, 1), histogram, bin_edges)
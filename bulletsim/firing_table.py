@@ -0,0 +1,210 @@
+import hashlib
+import itertools
+import os
+import tempfile
+from typing import NamedTuple
+
+import numpy as np
+
+from bulletsim.trajectory import G, RHO, C_D, A, MASS
+from bulletsim.adaptive import integrate_adaptive
+
+# Bump whenever the solver or the on-disk layout changes so old tables are rebuilt
+TABLE_VERSION = 1
+
+FIELDS = ('range', 'time_of_flight', 'apex_height', 'impact_velocity')
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'bulletsim')
+MAX_CACHED_TABLES = 8
+_PREFIX = 'firing_table-'
+_SUFFIXES = ('.npy', '-axes.npz')
+
+
+class FiringSolution(NamedTuple):
+    range: np.ndarray
+    time_of_flight: np.ndarray
+    apex_height: np.ndarray
+    impact_velocity: np.ndarray
+
+
+def _axis(spec):
+    start, stop, num = spec
+    return np.linspace(float(start), float(stop), int(num))
+
+
+def _write_atomic(path, write):
+    # Write beside path and rename into place, so an interrupted write never leaves half a file there
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.',
+                                     suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            write(file)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def cache_key(velocities, angles, drag_coefficients=None, rtol=1e-6):
+    """Key a table by its grid, solver tolerance and the physical constants it was built with."""
+    description = repr((TABLE_VERSION, G, RHO, C_D, A, MASS,
+                        tuple(velocities), tuple(angles),
+                        None if drag_coefficients is None else tuple(drag_coefficients), rtol))
+    return hashlib.sha1(description.encode()).hexdigest()[:16]
+
+
+class FiringTable:
+    """Range, time of flight, apex height and impact speed on a regular shot grid.
+
+    Axes are uniform grids of muzzle velocity (m/s), launch angle (radians) and drag
+    coefficient; ``values`` has shape ``(len(FIELDS), velocities, angles, drag
+    coefficients)`` and is usually a read-only memory map of the cached ``.npy`` file.
+    """
+
+    def __init__(self, velocities, angles, drag_coefficients, values):
+        self.axes = (np.asarray(velocities, dtype=np.float64),
+                     np.asarray(angles, dtype=np.float64),
+                     np.asarray(drag_coefficients, dtype=np.float64))
+        self.values = values
+        self._origin = np.array([axis[0] for axis in self.axes])
+        self._spacing = np.array([(axis[-1] - axis[0]) / (len(axis) - 1) if len(axis) > 1 else 1.0
+                                  for axis in self.axes])
+        self._last = np.array([len(axis) - 1 for axis in self.axes])
+        # Axes with a single value, such as the drag axis of a table built without one, can't be clamped to
+        self._fixed = [(name, index, float(axis[0])) for index, (name, axis) in
+                       enumerate(zip(('velocity', 'angle', 'drag_coefficient'), self.axes)) if len(axis) == 1]
+
+    def _check_fixed(self, point):
+        for name, index, value in self._fixed:
+            given = point[index]
+            off = abs(float(given) - value) if np.ndim(given) == 0 else np.max(np.abs(np.subtract(given, value)))
+            if off > 1e-9 * abs(value):
+                raise ValueError(f"this table was only built for {name} = {value}")
+
+    @classmethod
+    def build(cls, velocities, angles, drag_coefficients=None, rtol=1e-6):
+        """Solve every grid point with ``integrate_adaptive``.
+
+        ``velocities``, ``angles`` and ``drag_coefficients`` are ``(start, stop, num)``
+        specs. Without a drag axis the table is built at ``C_D``.
+        """
+        velocity_axis = _axis(velocities)
+        angle_axis = _axis(angles)
+        drag_axis = np.array([C_D]) if drag_coefficients is None else _axis(drag_coefficients)
+
+        values = np.empty((len(FIELDS), len(velocity_axis), len(angle_axis), len(drag_axis)))
+        for i, velocity in enumerate(velocity_axis):
+            for j, angle in enumerate(angle_axis):
+                for k, drag_coefficient in enumerate(drag_axis):
+                    result = integrate_adaptive(velocity, angle, drag_coefficient=drag_coefficient,
+                                                rtol=rtol, atol=rtol * 1e-3)
+                    values[:, i, j, k] = (result.range, result.time_of_flight,
+                                          result.apex_height, result.impact_velocity)
+        return cls(velocity_axis, angle_axis, drag_axis, values)
+
+    def save(self, path):
+        """Write ``<path>.npy`` (the table) and then ``<path>-axes.npz`` (the grid), each atomically."""
+        _write_atomic(path + '.npy', lambda file: np.save(file, self.values))
+        _write_atomic(path + '-axes.npz', lambda file: np.savez(
+            file, velocities=self.axes[0], angles=self.axes[1], drag_coefficients=self.axes[2]))
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        with np.load(path + '-axes.npz') as axes:
+            velocities, angles, drag_coefficients = axes['velocities'], axes['angles'], axes['drag_coefficients']
+        return cls(velocities, angles, drag_coefficients, np.load(path + '.npy', mmap_mode=mmap_mode))
+
+    def lookup(self, velocity, angle, drag_coefficient=C_D) -> FiringSolution:
+        """Multilinearly interpolate all fields; queries outside the grid are clamped to its edge.
+
+        Scalar queries return floats, anything else arrays of the broadcast shape.
+        An axis with a single value has no edge to clamp to, so querying any other
+        value on it raises ValueError.
+        """
+        if self._fixed:
+            self._check_fixed((velocity, angle, drag_coefficient))
+        if np.ndim(velocity) == np.ndim(angle) == np.ndim(drag_coefficient) == 0:
+            return self._lookup_scalar(float(velocity), float(angle), float(drag_coefficient))
+
+        point = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64)
+                                      for value in (velocity, angle, drag_coefficient)))
+        shape = point[0].shape
+        position = np.stack([p.ravel() for p in point], axis=-1)
+
+        position = np.clip((position - self._origin) / self._spacing, 0, self._last)
+        lower = np.minimum(position.astype(np.intp), np.maximum(self._last - 1, 0))
+        fraction = position - lower
+
+        result = np.zeros((len(FIELDS), position.shape[0]))
+        for corner in itertools.product((0, 1), repeat=3):
+            corner = np.array(corner)
+            weight = np.prod(np.where(corner, fraction, 1 - fraction), axis=-1)
+            index = np.minimum(lower + corner, self._last)
+            result += weight * self.values[:, index[:, 0], index[:, 1], index[:, 2]]
+        return FiringSolution(*(field.reshape(shape) for field in result))
+
+    def _lookup_scalar(self, velocity, angle, drag_coefficient):
+        # Single queries skip the vectorized path: slice the 2x2x2 cell around the
+        # point and blend it axis by axis, which keeps a lookup in the microseconds
+        lower = []
+        fraction = []
+        for value, origin, spacing, last in zip((velocity, angle, drag_coefficient),
+                                                self._origin, self._spacing, self._last):
+            position = min(max((value - origin) / spacing, 0.0), float(last))
+            index = min(int(position), max(int(last) - 1, 0))
+            lower.append(index)
+            fraction.append(position - index)
+        (i, j, k), (u, v, w) = lower, fraction
+        cell = np.asarray(self.values[:, i:i + 2, j:j + 2, k:k + 2], dtype=np.float64)
+        for axis, t in ((3, w), (2, v), (1, u)):
+            low = cell.take(0, axis=axis)
+            cell = low if cell.shape[axis] == 1 else low + t * (cell.take(1, axis=axis) - low)
+        return FiringSolution(*cell.tolist())
+
+
+def prune_cache(cache_dir=DEFAULT_CACHE_DIR, keep=MAX_CACHED_TABLES, current=None):
+    """Delete all but the ``keep`` most recently used tables in ``cache_dir``; returns how many went.
+
+    Tables left behind by old keys are never looked up again, so they are the
+    first to go. Use is tracked by the modification time of each table's files;
+    the table with key ``current``, if given, counts as the most recent whatever
+    its timestamps say.
+    """
+    last_used = {}
+    for name in os.listdir(cache_dir):
+        for suffix in _SUFFIXES:
+            if name.startswith(_PREFIX) and name.endswith(suffix):
+                stem = name[:-len(suffix)]
+                last_used[stem] = max(last_used.get(stem, 0.0), os.path.getmtime(os.path.join(cache_dir, name)))
+    if current is not None and _PREFIX + current in last_used:
+        last_used[_PREFIX + current] = float('inf')
+    stale = sorted(last_used, key=last_used.get, reverse=True)[keep:]
+    for stem in stale:
+        for suffix in _SUFFIXES:
+            try:
+                os.remove(os.path.join(cache_dir, stem + suffix))
+            except FileNotFoundError:
+                pass
+    return len(stale)
+
+
+def load_or_build(velocities=(50, 1000, 48), angles=(0.0, np.radians(80), 61), drag_coefficients=None,
+                  rtol=1e-6, cache_dir=DEFAULT_CACHE_DIR, keep=MAX_CACHED_TABLES) -> FiringTable:
+    """Return the cached table for this grid, building and saving it first if it is missing or stale.
+
+    A table is stale when any of the physical constants, the grid, the tolerance or
+    ``TABLE_VERSION`` has changed, since all of them feed into its file name. After
+    a build, only the ``keep`` most recently used tables stay in ``cache_dir``.
+    """
+    if keep < 1:
+        raise ValueError(f"keep must be at least 1 so the table being loaded survives pruning, not {keep}")
+    key = cache_key(velocities, angles, drag_coefficients, rtol)
+    path = os.path.join(cache_dir, _PREFIX + key)
+    if os.path.exists(path + '.npy') and os.path.exists(path + '-axes.npz'):
+        # Mark the table as used so pruning keeps it
+        os.utime(path + '-axes.npz')
+    else:
+        os.makedirs(cache_dir, exist_ok=True)
+        # save() renames the axes file into place last, so an interrupted build is never mistaken for a table
+        FiringTable.build(velocities, angles, drag_coefficients, rtol).save(path)
+        prune_cache(cache_dir, keep, current=key)
+    return FiringTable.load(path)
@@ -0,0 +1,27 @@
+import numpy as np
+from scipy.constants import g
+
+
+def bullet_acceleration(velocity, mass, drag_coefficient, shape, angular_velocity,
+                        air_density, wind_speed, wind_direction, latitude):
+    """Per-frame acceleration of many 2dbullet.py bullets at once.
+
+    ``velocity`` is an ``(n, 2)`` array in screen coordinates (y down); every other
+    argument is a scalar or an ``(n,)`` array. Reproduces ``Bullet.update``
+    term for term, including how its shapes broadcast: the drag magnitude and the
+    first Magnus component are added to both axes.
+    """
+    velocity = np.asarray(velocity, dtype=np.float64)
+    vx = velocity[:, 0]
+    vy = velocity[:, 1]
+
+    speed_squared = vx * vx + vy * vy
+    drag = -0.5 * air_density * speed_squared * drag_coefficient * shape
+    # cross((0, 0, w), (vx, vy, 0)) = (-w * vy, w * vx, 0); only its first row survives
+    magnus = -angular_velocity * vy * mass * drag_coefficient * shape
+    common = drag + magnus
+
+    acceleration = np.empty_like(velocity)
+    acceleration[:, 0] = common - 2 * vx * np.sin(latitude) + wind_speed * np.cos(wind_direction)
+    acceleration[:, 1] = common + mass * g - wind_speed * np.sin(wind_direction)
+    return acceleration
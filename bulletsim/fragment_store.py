@@ -0,0 +1,83 @@
+import numpy as np
+
+FLOOR = -1.0
+_FIELDS = ('position', 'velocity', 'size', 'color', 'mass')
+
+
+def swap_remove(arrays, count, mask):
+    """Drop the rows of ``arrays[:count]`` where ``mask`` is true; returns the new count.
+
+    The live rows past the new end move into the holes left below it, so only as
+    many rows are copied as were removed. Row order is not kept.
+    """
+    gone = np.flatnonzero(mask)
+    if len(gone) == 0:
+        return count
+    end = count - len(gone)
+    holes = gone[gone < end]
+    movers = np.setdiff1d(np.arange(end, count), gone, assume_unique=True)
+    for array in arrays:
+        array[holes] = array[movers]
+    return end
+
+
+class FragmentStore:
+    """Pieces of shattered 3dbullet.py targets kept as contiguous arrays.
+
+    Rows ``0 .. len(store) - 1`` are live, so a frame is one vectorized update over
+    ``[:len(store)]`` and the same slices go straight to an instanced draw. Pieces
+    whose bottom has reached the floor are dropped by a boolean mask with
+    ``swap_remove``.
+    """
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.position = np.empty((capacity, 3))
+        self.velocity = np.empty((capacity, 3))
+        self.size = np.empty((capacity, 3))  # Full edge lengths
+        self.color = np.empty((capacity, 3))
+        self.mass = np.empty(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def _reserve(self, count):
+        capacity = len(self.mass)
+        if count <= capacity:
+            return
+        while capacity < count:
+            capacity *= 2
+        for name in _FIELDS:
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:])
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, position, velocity, size, color, mass):
+        """Add ``len(position)`` pieces; the other arguments broadcast against them."""
+        position = np.reshape(position, (-1, 3))
+        start = self.count
+        end = start + len(position)
+        self._reserve(end)
+        self.position[start:end] = position
+        self.velocity[start:end] = velocity
+        self.size[start:end] = size
+        self.color[start:end] = color
+        self.mass[start:end] = mass
+        self.count = end
+
+    def remove(self, mask):
+        """Drop the live pieces where ``mask`` is true, keeping the rest dense."""
+        self.count = swap_remove([getattr(self, name) for name in _FIELDS], self.count, mask)
+
+    def step(self, dt, floor=FLOOR):
+        """Move every piece by ``dt`` seconds, then drop those that have reached ``floor``."""
+        n = self.count
+        if n == 0:
+            return
+        position = self.position[:n]
+        position += self.velocity[:n] * dt
+        self.remove(position[:, 1] - self.size[:n, 1] / 2 <= floor)
+
+    def clear(self):
+        self.count = 0
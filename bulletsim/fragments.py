@@ -0,0 +1,73 @@
+DEBRIS_BUDGET = 400
+
+
+class FragmentPool:
+    """Recycles debris fragments by ``(size, color)`` and caps how many are alive.
+
+    ``factory(size, color)`` builds a fragment when no released one of that kind
+    is free. Live fragments are tracked in spawn order; once there are more than
+    ``budget``, ``enforce_budget`` evicts resting fragments before moving ones,
+    and among those the oldest (``evict='oldest'``) or smallest
+    (``evict='smallest'``) first. ``resting(fragment)`` tells the two apart.
+    """
+
+    def __init__(self, factory, budget=DEBRIS_BUDGET, resting=lambda fragment: fragment.resting, evict='oldest'):
+        if evict not in ('oldest', 'smallest'):
+            raise ValueError(f"evict must be 'oldest' or 'smallest', not {evict!r}")
+        self.factory = factory
+        self.budget = budget
+        self.resting = resting
+        self.evict = evict
+        self.free = {}
+        self.live = {}  # Used as an insertion-ordered set, oldest first
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.live)
+
+    @property
+    def free_count(self):
+        return sum(len(fragments) for fragments in self.free.values())
+
+    @property
+    def hit_rate(self):
+        """Fraction of ``acquire`` calls served from released fragments."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def acquire(self, size, color):
+        """A fragment of ``size`` and ``color``, recycled if one is free."""
+        key = (size, color)
+        free = self.free.get(key)
+        if free:
+            fragment = free.pop()
+            self.hits += 1
+        else:
+            fragment = self.factory(size, color)
+            fragment.pool_key = key
+            self.misses += 1
+        self.live[fragment] = None
+        return fragment
+
+    def release(self, fragment):
+        """Return a live fragment to the free lists; the caller stops drawing and updating it."""
+        if self.live.pop(fragment, False) is None:
+            self.free.setdefault(fragment.pool_key, []).append(fragment)
+
+    def enforce_budget(self):
+        """Release fragments past ``budget`` and return them so the caller can drop their sprites."""
+        excess = len(self.live) - self.budget
+        if excess <= 0:
+            return []
+        resting = self.resting
+        if self.evict == 'oldest':
+            order = sorted(self.live, key=lambda fragment: not resting(fragment))
+        else:
+            order = sorted(self.live, key=lambda fragment: (not resting(fragment), fragment.pool_key[0]))
+        evicted = order[:excess]
+        for fragment in evicted:
+            self.release(fragment)
+        self.evictions += excess
+        return evicted
@@ -0,0 +1,112 @@
+"""Mesh data and GL geometry shared by the 3D front ends.
+
+Tessellating a sphere is far more work than drawing one, so ``SphereCache``
+builds each sphere once and hands the same geometry out for every later draw:
+a display list per radius bucket and tessellation level for immediate-mode
+code, or a unit-sphere vertex buffer per tessellation level for instanced
+drawing. ``SPHERES`` is the cache both 3dbullet.py and main.py share. GL objects
+are created lazily on first use, which must happen with a current GL context.
+"""
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GLU import *
+
+RADIUS_STEP = 0.01  # Radii in the same step share a display list
+
+
+def cube_vertices():
+    """Triangles of a unit cube centred on the origin, as ``(36, 3)`` float32."""
+    corners = np.array([
+        [-0.5, -0.5, 0.5], [0.5, -0.5, 0.5], [0.5, 0.5, 0.5], [-0.5, 0.5, 0.5],
+        [-0.5, -0.5, -0.5], [0.5, -0.5, -0.5], [0.5, 0.5, -0.5], [-0.5, 0.5, -0.5],
+    ], dtype=np.float32)
+    faces = np.array([
+        [0, 1, 2, 3],  # Front
+        [1, 5, 6, 2],  # Right
+        [5, 4, 7, 6],  # Back
+        [4, 0, 3, 7],  # Left
+        [3, 2, 6, 7],  # Top
+        [4, 5, 1, 0],  # Bottom
+    ])
+    return corners[faces[:, [0, 1, 2, 0, 2, 3]].ravel()]
+
+
+def sphere_vertices(slices=8, stacks=8):
+    """Triangles of a unit-radius sphere, tessellated like ``gluSphere(quad, 1, slices, stacks)``."""
+    theta = np.linspace(0.0, np.pi, stacks + 1)[:, None]
+    phi = np.linspace(0.0, 2 * np.pi, slices + 1)[None, :]
+    points = np.stack(np.broadcast_arrays(np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi),
+                                          np.cos(theta)), axis=-1).astype(np.float32)
+    a = points[:-1, :-1]
+    b = points[1:, :-1]
+    c = points[1:, 1:]
+    d = points[:-1, 1:]
+    return np.stack([a, b, c, a, c, d], axis=2).reshape(-1, 3)
+
+
+class Mesh:
+    """Triangle vertices in a static vertex buffer."""
+
+    def __init__(self, vertices):
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        self.count = len(vertices)
+        self.buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def delete(self):
+        glDeleteBuffers(1, [self.buffer])
+
+
+class SphereCache:
+    """Spheres tessellated once per radius bucket and level, and reused on every draw after that."""
+
+    def __init__(self, radius_step=RADIUS_STEP):
+        self.radius_step = radius_step
+        self._quadric = None
+        self._lists = {}
+        self._meshes = {}
+
+    def __len__(self):
+        return len(self._lists) + len(self._meshes)
+
+    def display_list(self, radius, slices=8, stacks=8):
+        """The display list of a ``radius`` sphere, rounded to the nearest ``radius_step``."""
+        key = (max(1, round(radius / self.radius_step)), slices, stacks)
+        index = self._lists.get(key)
+        if index is None:
+            # One quadric serves every sphere, instead of a new one leaking per call
+            if self._quadric is None:
+                self._quadric = gluNewQuadric()
+            index = self._lists[key] = glGenLists(1)
+            glNewList(index, GL_COMPILE)
+            gluSphere(self._quadric, key[0] * self.radius_step, slices, stacks)
+            glEndList()
+        return index
+
+    def draw(self, radius, slices=8, stacks=8):
+        """Draw a sphere at the origin of the current modelview matrix, like ``gluSphere``."""
+        glCallList(self.display_list(radius, slices, stacks))
+
+    def mesh(self, slices=8, stacks=8):
+        """A unit-radius sphere ``Mesh`` for instanced drawing, scaled per instance."""
+        mesh = self._meshes.get((slices, stacks))
+        if mesh is None:
+            mesh = self._meshes[slices, stacks] = Mesh(sphere_vertices(slices, stacks))
+        return mesh
+
+    def clear(self):
+        """Free every display list, buffer and the quadric, e.g. before the GL context goes away."""
+        for index in self._lists.values():
+            glDeleteLists(index, 1)
+        for mesh in self._meshes.values():
+            mesh.delete()
+        if self._quadric is not None:
+            gluDeleteQuadric(self._quadric)
+        self._lists.clear()
+        self._meshes.clear()
+        self._quadric = None
+
+
+SPHERES = SphereCache()
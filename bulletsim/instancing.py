@@ -0,0 +1,121 @@
+"""Instanced OpenGL drawing of many cubes and spheres, for 3dbullet.py.
+
+Each mesh is uploaded to a vertex buffer once. Every frame, the positions, sizes
+and colours of all its instances go up in a single buffer and the whole lot is
+drawn with one ``glDrawArraysInstanced`` call, instead of a ``glBegin``/``glEnd``
+block per object. The shader reads the fixed-function matrices, so
+``gluPerspective`` and ``gluLookAt`` keep working as before. Needs a current GL
+context; without instancing support (OpenGL < 3.3) each instance is drawn from
+the same buffers with one ``glDrawArrays`` call.
+"""
+import ctypes
+
+import numpy as np
+from OpenGL.GL import *
+
+from bulletsim.geometry import SPHERES, Mesh, cube_vertices
+
+VERTEX, OFFSET, SCALE, COLOR = 0, 1, 2, 3  # Attribute locations
+_INSTANCE_ATTRIBUTES = (OFFSET, SCALE, COLOR)
+_INSTANCE_STRIDE = 9 * 4  # offset, scale and colour as float32
+
+_VERTEX_SHADER = """
+#version 120
+attribute vec3 vertex;
+attribute vec3 offset;
+attribute vec3 scale;
+attribute vec3 color;
+varying vec3 fragment_color;
+
+void main()
+{
+    fragment_color = color;
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(vertex * scale + offset, 1.0);
+}
+"""
+
+_FRAGMENT_SHADER = """
+#version 120
+varying vec3 fragment_color;
+
+void main()
+{
+    gl_FragColor = vec4(fragment_color, 1.0);
+}
+"""
+
+
+def _compile(source, kind):
+    shader = glCreateShader(kind)
+    glShaderSource(shader, source)
+    glCompileShader(shader)
+    if not glGetShaderiv(shader, GL_COMPILE_STATUS):
+        raise RuntimeError(glGetShaderInfoLog(shader).decode())
+    return shader
+
+
+class InstancedRenderer:
+    """Draws any number of cubes or spheres of a mesh in one call.
+
+    ``draw_cubes`` takes full edge lengths and ``draw_spheres`` radii. Positions
+    are ``(n, 3)``; sizes and colours have one row per instance or a single value
+    broadcast to all of them, so everything can come straight from NumPy state.
+    """
+
+    def __init__(self, sphere_slices=8, sphere_stacks=8):
+        program = self.program = glCreateProgram()
+        glAttachShader(program, _compile(_VERTEX_SHADER, GL_VERTEX_SHADER))
+        glAttachShader(program, _compile(_FRAGMENT_SHADER, GL_FRAGMENT_SHADER))
+        for location, name in ((VERTEX, 'vertex'), (OFFSET, 'offset'), (SCALE, 'scale'), (COLOR, 'color')):
+            glBindAttribLocation(program, location, name)
+        glLinkProgram(program)
+        if not glGetProgramiv(program, GL_LINK_STATUS):
+            raise RuntimeError(glGetProgramInfoLog(program).decode())
+
+        self.cube = Mesh(cube_vertices())
+        self.sphere = SPHERES.mesh(sphere_slices, sphere_stacks)
+        self.instances = glGenBuffers(1)
+        self.instanced = bool(glDrawArraysInstanced) and bool(glVertexAttribDivisor)
+
+    def draw_cubes(self, positions, sizes, colors):
+        self.draw(self.cube, positions, sizes, colors)
+
+    def draw_spheres(self, positions, radii, colors):
+        self.draw(self.sphere, positions, np.reshape(radii, (-1, 1)), colors)
+
+    def draw(self, mesh, positions, scales, colors):
+        """Draw ``mesh`` scaled by ``scales``, moved to ``positions`` and tinted ``colors``."""
+        positions = np.reshape(positions, (-1, 3))
+        count = len(positions)
+        if count == 0:
+            return
+        instances = np.empty((count, 9), dtype=np.float32)
+        instances[:, 0:3] = positions
+        instances[:, 3:6] = scales
+        instances[:, 6:9] = colors
+
+        glUseProgram(self.program)
+        glBindBuffer(GL_ARRAY_BUFFER, mesh.buffer)
+        glEnableVertexAttribArray(VERTEX)
+        glVertexAttribPointer(VERTEX, 3, GL_FLOAT, GL_FALSE, 0, None)
+        if self.instanced:
+            glBindBuffer(GL_ARRAY_BUFFER, self.instances)
+            # Orphan last frame's data rather than wait for the GPU to finish with it
+            glBufferData(GL_ARRAY_BUFFER, instances.nbytes, instances, GL_STREAM_DRAW)
+            for index, location in enumerate(_INSTANCE_ATTRIBUTES):
+                glEnableVertexAttribArray(location)
+                glVertexAttribPointer(location, 3, GL_FLOAT, GL_FALSE, _INSTANCE_STRIDE, ctypes.c_void_p(12 * index))
+                glVertexAttribDivisor(location, 1)
+            glDrawArraysInstanced(GL_TRIANGLES, 0, mesh.count, count)
+            for location in _INSTANCE_ATTRIBUTES:
+                glVertexAttribDivisor(location, 0)
+                glDisableVertexAttribArray(location)
+        else:
+            for offset_x, offset_y, offset_z, scale_x, scale_y, scale_z, red, green, blue in instances.tolist():
+                glVertexAttrib3f(OFFSET, offset_x, offset_y, offset_z)
+                glVertexAttrib3f(SCALE, scale_x, scale_y, scale_z)
+                glVertexAttrib3f(COLOR, red, green, blue)
+                glDrawArrays(GL_TRIANGLES, 0, mesh.count)
+        glDisableVertexAttribArray(VERTEX)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glUseProgram(0)
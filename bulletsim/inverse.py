@@ -0,0 +1,175 @@
+import functools
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from bulletsim.trajectory import C_D, A, MASS, INITIAL_VELOCITY, TIME_STEP
+from bulletsim.adaptive import integrate_adaptive
+from bulletsim.batch import solve_batch
+
+# Inputs are rounded to this many significant digits before they reach the cache,
+# so fire-control queries that differ only by float noise share one entry
+QUANTIZE_DIGITS = 6
+CACHE_SIZE = 4096
+
+_INVERSE_GOLDEN = (math.sqrt(5) - 1) / 2
+_RIGHT_ANGLE = math.pi / 2
+
+
+class AngleSolution(NamedTuple):
+    low: float  # Flat-fire launch angle (radians), NaN when out of range
+    high: float  # Lobbed launch angle (radians), NaN when out of range
+    max_range: float  # Furthest reachable distance for these shot parameters (m)
+
+
+def _quantize(value):
+    return float('%.*g' % (QUANTIZE_DIGITS, value))
+
+
+def _golden_maximum(f, lo, hi, tolerance):
+    """Maximize a unimodal ``f`` on ``[lo, hi]``; returns ``(argmax, max)``."""
+    a, b = lo, hi
+    c = b - _INVERSE_GOLDEN * (b - a)
+    d = a + _INVERSE_GOLDEN * (b - a)
+    f_c, f_d = f(c), f(d)
+    while b - a > tolerance:
+        if f_c > f_d:
+            b, d, f_d = d, c, f_c
+            c = b - _INVERSE_GOLDEN * (b - a)
+            f_c = f(c)
+        else:
+            a, c, f_c = c, d, f_d
+            d = a + _INVERSE_GOLDEN * (b - a)
+            f_d = f(d)
+    return (c, f_c) if f_c > f_d else (d, f_d)
+
+
+def _illinois(f, lo, hi, f_lo, f_hi, tolerance, max_iterations=100):
+    """Root of ``f`` in ``[lo, hi]`` by the Illinois variant of regula falsi.
+
+    Without a sign change the endpoint nearer to a root is returned: ``lo`` if
+    ``f_lo`` is zero, otherwise ``hi``.
+    """
+    if f_lo == 0 or (f_lo < 0) == (f_hi < 0):
+        return lo if f_lo == 0 else hi
+    mid = lo
+    side = 0
+    for _ in range(max_iterations):
+        mid = (lo * f_hi - hi * f_lo) / (f_hi - f_lo)
+        f_mid = f(mid)
+        if f_mid == 0 or abs(hi - lo) <= tolerance:
+            break
+        if (f_mid < 0) == (f_hi < 0):
+            hi, f_hi = mid, f_mid
+            if side == -1:
+                f_lo /= 2
+            side = -1
+        else:
+            lo, f_lo = mid, f_mid
+            if side == 1:
+                f_hi /= 2
+            side = 1
+    return mid
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _solve_quantized(distance, initial_velocity, mass, drag_coefficient, area, rtol):
+    def miss(angle):
+        return integrate_adaptive(initial_velocity, angle, mass, drag_coefficient, area,
+                                  rtol=rtol, atol=rtol * 1e-3).range - distance
+
+    peak, peak_miss = _golden_maximum(miss, 0.0, _RIGHT_ANGLE, 1e-6)
+    max_range = peak_miss + distance
+    if peak_miss < 0:
+        return AngleSolution(math.nan, math.nan, max_range)
+
+    low = _illinois(miss, 0.0, peak, miss(0.0), peak_miss, 1e-10)
+    high = _illinois(miss, peak, _RIGHT_ANGLE, peak_miss, miss(_RIGHT_ANGLE), 1e-10)
+    return AngleSolution(low, high, max_range)
+
+
+def solve_angle(distance, initial_velocity=INITIAL_VELOCITY, mass=MASS, drag_coefficient=C_D, area=A,
+                rtol=1e-6) -> AngleSolution:
+    """Launch angles that land a shot ``distance`` metres away on level ground.
+
+    Finds the maximum-range angle by golden-section search over the adaptive
+    integrator, then root-finds the low and high arcs on either side of it. Results
+    are memoized on the inputs rounded to ``QUANTIZE_DIGITS`` significant digits;
+    see ``cache_info``.
+    """
+    return _solve_quantized(_quantize(distance), _quantize(initial_velocity), _quantize(mass),
+                            _quantize(drag_coefficient), _quantize(area), rtol)
+
+
+cache_info = _solve_quantized.cache_info
+cache_clear = _solve_quantized.cache_clear
+
+
+def solve_angles(distances, initial_velocity=INITIAL_VELOCITY, mass=MASS, drag_coefficient=C_D, area=A,
+                 time_step=TIME_STEP, tolerance=1e-6, max_iterations=60) -> AngleSolution:
+    """Vectorized ``solve_angle`` for many targets at once.
+
+    All arguments broadcast together. Every golden-section and root-finding
+    iteration integrates the whole batch with one ``solve_batch`` call, so accuracy
+    is that of the Euler solver at ``time_step`` rather than of the adaptive one.
+    Returns an ``AngleSolution`` of arrays.
+    """
+    # Work on flat arrays and restore the broadcast shape of the arguments at the end
+    shape = np.broadcast(distances, initial_velocity, mass, drag_coefficient, area).shape
+    distance, velocity, mass, drag_coefficient, area = (
+        value.ravel() for value in np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in
+                                                          (distances, initial_velocity, mass,
+                                                           drag_coefficient, area))))
+
+    def miss(angle, which=slice(None)):
+        result = solve_batch(velocity[which], angle, mass[which], drag_coefficient[which], area[which],
+                             time_step=time_step)
+        return result.range - distance[which]
+
+    # Golden-section search for the maximum-range angle of every target together
+    a = np.zeros_like(distance)
+    b = np.full_like(distance, _RIGHT_ANGLE)
+    c = b - _INVERSE_GOLDEN * (b - a)
+    d = a + _INVERSE_GOLDEN * (b - a)
+    f_c, f_d = miss(c), miss(d)
+    while np.max(b - a) > tolerance:
+        left = f_c > f_d
+        b = np.where(left, d, b)
+        a = np.where(left, a, c)
+        c, d = np.where(left, b - _INVERSE_GOLDEN * (b - a), d), np.where(left, c, a + _INVERSE_GOLDEN * (b - a))
+        f_new = miss(np.where(left, c, d))
+        f_c, f_d = np.where(left, f_new, f_d), np.where(left, f_c, f_new)
+    peak = np.where(f_c > f_d, c, d)
+    peak_miss = np.maximum(f_c, f_d)
+
+    # Illinois root-finding on both arcs at once: rows are (low arc, high arc)
+    lo = np.stack([np.zeros_like(peak), peak])
+    hi = np.stack([peak, np.full_like(peak, _RIGHT_ANGLE)])
+    f_lo = np.stack([-distance, peak_miss])
+    f_hi = np.stack([peak_miss, miss(hi[1])])
+    reachable = np.broadcast_to(peak_miss >= 0, lo.shape)
+    angle = np.where(f_lo == 0, lo, hi)
+    pending = reachable & (f_lo != 0) & ((f_lo < 0) != (f_hi < 0))
+    side = np.zeros(lo.shape, dtype=np.int8)
+    for _ in range(max_iterations):
+        row, column = np.nonzero(pending)
+        if row.size == 0:
+            break
+        l, h = lo[row, column], hi[row, column]
+        fl, fh, s = f_lo[row, column], f_hi[row, column], side[row, column]
+        step = (l * fh - h * fl) / (fh - fl)
+        f_step = miss(step, column)
+        angle[row, column] = step
+
+        # Keep the bracket, halving the stale endpoint when the same side moves twice
+        same = (f_step < 0) == (fh < 0)
+        lo[row, column] = np.where(same, l, step)
+        hi[row, column] = np.where(same, step, h)
+        f_lo[row, column] = np.where(same, np.where(s == -1, fl / 2, fl), f_step)
+        f_hi[row, column] = np.where(same, f_step, np.where(s == 1, fh / 2, fh))
+        side[row, column] = np.where(same, -1, 1)
+        pending[row, column] = (f_step != 0) & (np.abs(hi[row, column] - lo[row, column]) > tolerance)
+
+    angle = np.where(reachable, angle, np.nan)
+    return AngleSolution(angle[0].reshape(shape), angle[1].reshape(shape), (peak_miss + distance).reshape(shape))
@@ -0,0 +1,130 @@
+from typing import NamedTuple
+
+import numpy as np
+
+SEARCH_ITERATIONS = 40
+
+
+class SphereHits(NamedTuple):
+    sphere: np.ndarray  # Index of the moving sphere for each hit
+    box: np.ndarray  # Index of the box it hits
+    time: np.ndarray  # Fraction of the step travelled at first contact; 0 if it starts touching
+
+
+def _box_distance_sq(points, centers, half_sizes):
+    # Squared distance from each point to the nearest point of its box, zero inside it
+    outside = np.abs(points - centers) - half_sizes
+    np.maximum(outside, 0.0, out=outside)
+    return np.einsum('...k,...k->...', outside, outside)
+
+
+def _slab(origin, delta, low, high):
+    # Range of path fractions within [0, 1] each segment spends inside its box; empty if first > last.
+    # Arguments are axis-first, (3, ...), so every operation runs on whole contiguous planes.
+    first, last = 0.0, 1.0
+    for axis in range(3):
+        start, step, near, far = origin[axis], delta[axis], low[axis] - origin[axis], high[axis] - origin[axis]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverse = 1.0 / step
+            near = near * inverse
+            far = far * inverse
+        entry = np.minimum(near, far)
+        exit_ = np.maximum(near, far)
+        # An axis without motion either always overlaps the slab or never does
+        still = step == 0
+        if still.any():
+            inside = (start >= low[axis]) & (start <= high[axis])
+            entry = np.where(still, np.where(inside, -np.inf, np.inf), entry)
+            exit_ = np.where(still, np.where(inside, np.inf, -np.inf), exit_)
+        first = np.maximum(first, entry)
+        last = np.minimum(last, exit_)
+    return first, last
+
+
+def sphere_aabb(centers, radii, box_centers, box_sizes):
+    """``(sphere_indices, box_indices)`` of every sphere touching an axis-aligned box.
+
+    ``centers`` is ``(n, 3)`` and ``radii`` one per sphere or a single value;
+    ``box_centers`` and ``box_sizes`` (full edge lengths) are ``(m, 3)``. All
+    ``n x m`` pairs are tested in one broadcast with the exact distance from each
+    centre to the closest point of each box. Pairs come out ordered by sphere,
+    then box.
+    """
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+    radii = np.broadcast_to(np.asarray(radii, dtype=np.float64).reshape(-1), (len(centers),))
+    box_centers = np.asarray(box_centers, dtype=np.float64).reshape(-1, 3)
+    half_sizes = np.asarray(box_sizes, dtype=np.float64).reshape(-1, 3) / 2
+    distance_sq = _box_distance_sq(centers[:, None, :], box_centers[None], half_sizes[None])
+    return np.nonzero(distance_sq <= radii[:, None] ** 2)
+
+
+def sweep_spheres(start, end, radii, box_centers, box_sizes, pairs=None,
+                  iterations=SEARCH_ITERATIONS) -> SphereHits:
+    """Continuous collision of spheres moving from ``start`` to ``end`` against axis-aligned boxes.
+
+    Shapes are as for ``sphere_aabb``, with ``start`` and ``end`` the ``(n, 3)``
+    centres at the beginning and end of a step. ``pairs`` is an optional
+    ``(sphere_indices, box_indices)`` pair of candidate arrays; by default every
+    sphere is tested against every box. A slab test of each centre's path against
+    the box grown by the radius rejects most pairs at once. That test is exact on
+    the faces, but the grown box is square at the corners and edges, where the
+    swept sphere is round. The survivors are settled with the exact distance,
+    which is convex along the path: a ternary search finds the closest approach
+    and a bisection the first contact, all pairs together.
+    """
+    start = np.asarray(start, dtype=np.float64).reshape(-1, 3)
+    end = np.asarray(end, dtype=np.float64).reshape(-1, 3)
+    radii = np.broadcast_to(np.asarray(radii, dtype=np.float64).reshape(-1), (len(start),))
+    box_centers = np.asarray(box_centers, dtype=np.float64).reshape(-1, 3)
+    half_sizes = np.asarray(box_sizes, dtype=np.float64).reshape(-1, 3) / 2
+    if pairs is None:
+        # Every sphere against every box, broadcast as (3, n, m)
+        origin = start.T[:, :, None]
+        delta = end.T[:, :, None] - origin
+        grown = half_sizes.T[:, None, :] + radii[:, None]
+        first, last = _slab(origin, delta, box_centers.T[:, None, :] - grown, box_centers.T[:, None, :] + grown)
+        sphere, box = np.nonzero(first <= last)
+        first, last = first[sphere, box], last[sphere, box]
+    else:
+        sphere, box = (np.asarray(index, dtype=np.intp) for index in pairs)
+        grown = (half_sizes[box] + radii[sphere, None]).T
+        origin = start[sphere].T
+        first, last = _slab(origin, end[sphere].T - origin, box_centers[box].T - grown, box_centers[box].T + grown)
+        keep = first <= last
+        sphere, box, first, last = sphere[keep], box[keep], first[keep], last[keep]
+
+    if len(sphere) == 0:
+        return SphereHits(sphere, box, first)
+
+    origin = start[sphere]
+    delta = end[sphere] - origin
+    center = box_centers[box]
+    half = half_sizes[box]
+    reach = radii[sphere] ** 2
+
+    def distance_sq(t):
+        return _box_distance_sq(origin + t[:, None] * delta, center, half)
+
+    # Closest approach within the grown box
+    low_t, high_t = first.copy(), last.copy()
+    for _ in range(iterations):
+        third = (high_t - low_t) / 3
+        left = low_t + third
+        right = high_t - third
+        closer = distance_sq(left) < distance_sq(right)
+        high_t = np.where(closer, right, high_t)
+        low_t = np.where(closer, low_t, left)
+    closest = (low_t + high_t) / 2
+    hit = distance_sq(closest) <= reach
+    sphere, box, first, closest, reach = sphere[hit], box[hit], first[hit], closest[hit], reach[hit]
+    origin, delta, center, half = origin[hit], delta[hit], center[hit], half[hit]
+
+    # First contact: the distance falls monotonically from where the path enters the grown box to the closest point
+    touching = distance_sq(first) <= reach
+    low_t, high_t = first, np.where(touching, first, closest)
+    for _ in range(iterations):
+        middle = (low_t + high_t) / 2
+        inside = distance_sq(middle) <= reach
+        high_t = np.where(inside, middle, high_t)
+        low_t = np.where(inside, low_t, middle)
+    return SphereHits(sphere, box, high_t)
@@ -0,0 +1,169 @@
+"""Compact binary input logs, and headless replay of them at full speed.
+
+A log starts with a header naming the scene, the seed its random numbers were
+drawn from and the physics substeps per step, then a table of the event kinds it
+uses, each a code and the ``struct`` format of its values. After that come the
+frames: an 8-byte ``(ticks, repeat, events)`` record followed by the frame's
+events. Runs of identical frames without events share one record, so idle time
+costs almost nothing, and a final record with a repeat of 0 holds inputs that
+came after the last step. What ``ticks`` counts is up to the scene: fixed physics
+steps in 2D, milliseconds of frame time in 3D.
+
+``python -m bulletsim.replay session.bsr`` replays a log and reports how long it took.
+"""
+import argparse
+import struct
+import time
+from typing import NamedTuple
+
+from bulletsim import sim2d, sim3d
+
+MAGIC = b'BSIL'
+VERSION = 1
+SCENE_2D = 2
+SCENE_3D = 3
+_HEADER = struct.Struct('<4sBBQBB')  # magic, version, scene, seed, substeps, event kinds
+_KIND = struct.Struct('<BB')  # event code, length of its struct format
+_FRAME = struct.Struct('<IHH')  # ticks, repeat, events
+_CODE = struct.Struct('<B')
+_MAX_REPEAT = 0xFFFF
+
+
+class Frame(NamedTuple):
+    ticks: int
+    repeat: int  # Consecutive frames this record stands for; events happen in the first. 0: events only
+    events: list  # (code, values) in the order they happened
+
+
+class Recording(NamedTuple):
+    scene: int
+    seed: int
+    substeps: int
+    frames: list
+
+    def frame_count(self):
+        return sum(frame.repeat for frame in self.frames)
+
+    def tick_count(self):
+        return sum(frame.ticks * frame.repeat for frame in self.frames)
+
+
+class InputRecorder:
+    """Writes a log as a live session runs.
+
+    ``formats`` maps each event code the scene uses to the ``struct`` format of its
+    values. Call ``event`` for every input as it is applied, then ``end_frame``
+    once per frame with the ticks it advanced.
+    """
+
+    def __init__(self, path, scene, seed, formats, substeps=1):
+        self._file = open(path, 'wb')
+        self._formats = {code: struct.Struct('<' + fmt) for code, fmt in formats.items()}
+        self._events = []
+        self._pending = None  # (ticks, repeat, events) not yet written
+        self._file.write(_HEADER.pack(MAGIC, VERSION, scene, seed, substeps, len(formats)))
+        for code, fmt in formats.items():
+            fmt = fmt.encode('ascii')
+            self._file.write(_KIND.pack(code, len(fmt)) + fmt)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def event(self, code, *values):
+        self._events.append(_CODE.pack(code) + self._formats[code].pack(*values))
+
+    def end_frame(self, ticks):
+        pending = self._pending
+        if (not self._events and pending is not None and not pending[2] and pending[0] == ticks
+                and pending[1] < _MAX_REPEAT):
+            self._pending = (ticks, pending[1] + 1, pending[2])
+            return
+        self._flush()
+        self._pending = (ticks, 1, self._events)
+        self._events = []
+
+    def _flush(self):
+        if self._pending is not None:
+            ticks, repeat, events = self._pending
+            self._file.write(_FRAME.pack(ticks, repeat, len(events)))
+            self._file.writelines(events)
+            self._pending = None
+
+    def close(self):
+        if not self._file.closed:
+            self._flush()
+            if self._events:
+                # Inputs after the last frame are applied but never stepped, as in the live session
+                self._pending = (0, 0, self._events)
+                self._events = []
+                self._flush()
+            self._file.close()
+
+
+def read_log(path) -> Recording:
+    """Load a whole log written by ``InputRecorder``."""
+    with open(path, 'rb') as file:
+        data = file.read()
+    magic, version, scene, seed, substeps, kinds = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not an input log")
+    if version != VERSION:
+        raise ValueError(f"{path} is input log version {version}, expected {VERSION}")
+    offset = _HEADER.size
+    formats = {}
+    for _ in range(kinds):
+        code, length = _KIND.unpack_from(data, offset)
+        offset += _KIND.size
+        formats[code] = struct.Struct('<' + data[offset:offset + length].decode('ascii'))
+        offset += length
+
+    frames = []
+    while offset < len(data):
+        ticks, repeat, count = _FRAME.unpack_from(data, offset)
+        offset += _FRAME.size
+        events = []
+        for _ in range(count):
+            code, = _CODE.unpack_from(data, offset)
+            fmt = formats[code]
+            events.append((code, fmt.unpack_from(data, offset + _CODE.size)))
+            offset += _CODE.size + fmt.size
+        frames.append(Frame(ticks, repeat, events))
+    return Recording(scene, seed, substeps, frames)
+
+
+def replay(recording):
+    """Play ``recording`` back without a display, as fast as possible.
+
+    Returns the 2D ``World`` or 3D ``Scene`` in its final state.
+    """
+    if recording.scene == SCENE_2D:
+        return sim2d.replay(recording)
+    if recording.scene == SCENE_3D:
+        return sim3d.replay(recording)
+    raise ValueError(f"unknown scene {recording.scene}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded 2dbullet.py or 3dbullet.py session headlessly.")
+    parser.add_argument('log')
+    parser.add_argument('--repeat', type=int, default=1, help="replay this many times and report the fastest")
+    args = parser.parse_args(argv)
+
+    recording = read_log(args.log)
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        replay(recording)
+        best = min(best, time.perf_counter() - start)
+    frames = recording.frame_count()
+    unit = "steps" if recording.scene == SCENE_2D else "ms"
+    print(f"{args.log}: {recording.scene}D scene, seed {recording.seed}, {frames} frames "
+          f"({recording.tick_count()} {unit}, {recording.substeps} substeps)")
+    print(f"replayed in {best:.3f} s: {frames / best:,.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""The 2dbullet.py simulation without pygame: bullets, cubes, collisions and explosions.
+
+Coordinates are screen pixels with y pointing down, and time is in frames of the
+original 60 Hz game loop. ``World.step`` advances by a fraction of a frame. The
+front end only reads the state back to draw it, so the same world runs headless
+for benchmarks and replays.
+
+Player input reaches the world as events passed to ``World.apply``; recording
+those and the number of steps each frame took is enough to replay a session.
+"""
+import math
+import random
+from typing import NamedTuple
+
+import numpy as np
+from scipy.constants import g
+
+from bulletsim.broadphase import SpatialHash
+from bulletsim.bullet_pool import BULLET_SIZE, BulletPool
+from bulletsim.fragments import DEBRIS_BUDGET, FragmentPool
+from bulletsim.sweep import first_hits, sweep_aabb
+
+SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
+RED = (255, 0, 0)  # Wood
+BLUE = (0, 0, 255)  # Glass
+BULLET_SHAPE = 0.01
+BULLET_DRAG_COEFFICIENT = 0.3
+FLOOR_FRICTION = 0.9  # Fraction of its sideways speed a cube on the floor keeps each frame
+SLEEP_SPEED = 0.05  # Sideways speed (px/frame) below which a cube on the floor counts as at rest
+SLEEP_FRAMES = 30  # Frames at rest before a cube stops being updated
+WAKE_RADIUS = 50  # Sleeping cubes within this many px of an impact wake up
+
+# Input events and the struct formats of their values
+FIRE, WIND_SPEED, AIR_DENSITY = 1, 2, 3
+EVENT_FORMATS = {FIRE: 'hhdd', WIND_SPEED: 'd', AIR_DENSITY: 'd'}
+
+
+class Rect:
+    """The part of ``pygame.Rect`` the simulation uses, with the same integer semantics."""
+    __slots__ = ('x', 'y', 'w', 'h')
+
+    def __init__(self, x, y, w, h):
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+
+    def __repr__(self):
+        return f"Rect({self.x}, {self.y}, {self.w}, {self.h})"
+
+    left = property(lambda self: self.x)
+    top = property(lambda self: self.y)
+    right = property(lambda self: self.x + self.w)
+
+    @property
+    def bottom(self):
+        return self.y + self.h
+
+    @bottom.setter
+    def bottom(self, value):
+        self.y = value - self.h
+
+    @property
+    def center(self):
+        return self.x + self.w // 2, self.y + self.h // 2
+
+    @center.setter
+    def center(self, value):
+        self.x = value[0] - self.w // 2
+        self.y = value[1] - self.h // 2
+
+    centery = property(lambda self: self.y + self.h // 2)
+
+    def inflate(self, x, y):
+        return Rect(self.x - x // 2, self.y - y // 2, self.w + x, self.h + y)
+
+
+class Impact(NamedTuple):
+    bullet_mass: float
+    bullet_velocity: float
+    bullet_velocity_after: float
+    cube_mass: float
+    energy_absorbed: float
+
+
+class Bullet:
+    """Handle on one bullet in ``World.bullet_pool``; ``slot`` is None once it is gone."""
+    __slots__ = ('pool', 'slot')
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.slot = None
+
+    @property
+    def angle(self):
+        return self.pool.angle[self.slot]
+
+    @property
+    def mass(self):
+        return self.pool.mass[self.slot]
+
+    @property
+    def velocity(self):
+        return self.pool.velocity[self.slot]
+
+    def interpolated_center(self, alpha):
+        previous = self.pool.previous[self.slot]
+        x, y = previous + alpha * (self.pool.position[self.slot] - previous)
+        return round(x), round(y)
+
+
+class Cube:
+    def __init__(self, world, x, y, size, color, mass):
+        self.world = world
+        self.rect = Rect(0, 0, size, size)
+        self.rect.center = (x, y)
+        self.color = color
+        self.size = size
+        self.original_size = size
+        self.mass = mass
+        self.velocity = np.array([0.0, 0.0])
+        self.position = np.array([x, y], dtype=np.float64)  # Sub-pixel centre; rect follows it
+        self.previous = self.position.copy()  # Centre at the start of the last physics step
+        self.is_broken = False
+        self.rest_time = 0.0
+        self.asleep = False
+
+    def reset(self, x, y, mass, velocity):
+        # Bring a recycled fragment back to the state a fresh Cube(x, y, ...) would have
+        self.size = self.original_size
+        self.rect = Rect(0, 0, self.size, self.size)
+        self.rect.center = (x, y)
+        self.position[:] = (x, y)
+        self.previous[:] = (x, y)
+        self.mass = mass
+        self.velocity[:] = velocity
+        self.is_broken = False
+        self.rest_time = 0.0
+
+    @property
+    def resting(self):
+        return self.rect.bottom >= self.world.height and self.velocity[1] == 0.0
+
+    def update(self, dt=1.0):
+        if self.is_broken:
+            # Broken cubes never move again
+            self.world.sleep(self)
+            return
+
+        self.velocity[1] += self.mass * g * dt
+        self.position += self.velocity * dt
+        self.rect.center = (round(self.position[0]), round(self.position[1]))
+
+        # A cube that leaves either side of the world never comes back, and light fragments thrown
+        # far above it take so long to fall that they are as good as gone
+        rect = self.rect
+        if rect.right < 0 or rect.left > self.world.width or rect.bottom < -self.world.height:
+            self.world.discard(self)
+            return
+
+        # Simulate a floor
+        if self.rect.bottom >= self.world.height:
+            self.rect.bottom = self.world.height
+            self.position[1] = self.rect.centery
+            self.velocity[1] = 0.0
+            # Friction with the floor slows sliding cubes until they come to rest
+            self.velocity[0] *= FLOOR_FRICTION ** dt
+            if abs(self.velocity[0]) < SLEEP_SPEED:
+                self.velocity[0] = 0.0
+
+            # Lying still on the floor for long enough puts the cube to sleep
+            if self.velocity[0] == 0.0:
+                self.rest_time += dt
+                if self.rest_time >= SLEEP_FRAMES:
+                    self.world.sleep(self)
+                return
+        self.rest_time = 0.0
+
+    def interpolated_center(self, alpha):
+        x, y = self.previous + alpha * (self.position - self.previous)
+        return round(x), round(y)
+
+    def _shrink(self):
+        center = self.rect.center
+        self.size = self.size // 2
+        self.rect = Rect(0, 0, self.size, self.size)
+        self.rect.center = center
+
+    def explode(self):
+        world = self.world
+        rng = world.random
+        if self.color == BLUE:  # Glass cube shatters
+            self.is_broken = True
+
+            # Generate smaller glass pieces
+            num_pieces = rng.randint(8, 12)
+            piece_size = self.size // num_pieces
+            for _ in range(num_pieces):
+                piece_x = self.rect.x + rng.randint(0, self.size - piece_size)
+                piece_y = self.rect.y + rng.randint(0, self.size - piece_size)
+                world.spawn_fragment(piece_x, piece_y, piece_size, BLUE, self.mass * 0.1,
+                                     (rng.uniform(-10, 10), rng.uniform(-15, -10)))
+            self._shrink()
+
+        elif self.color == RED:  # Wooden cube breaks apart
+            self.is_broken = True
+
+            # Generate smaller wooden pieces
+            num_pieces = rng.randint(4, 8)
+            piece_size = self.size // num_pieces
+            for _ in range(num_pieces):
+                piece_x = self.rect.x + rng.randint(0, self.size - piece_size)
+                piece_y = self.rect.y + rng.randint(0, self.size - piece_size)
+                world.spawn_fragment(piece_x, piece_y, piece_size, RED, self.mass * 0.1,
+                                     (rng.uniform(-5, 5), rng.uniform(-2, 2)))
+            self._shrink()
+
+        # Generate smaller pieces within the original cube
+        num_inner_pieces = rng.randint(4, 8)
+        inner_piece_size = self.size // num_inner_pieces
+        for _ in range(num_inner_pieces):
+            inner_piece_x = self.rect.x + rng.randint(0, self.size - inner_piece_size)
+            inner_piece_y = self.rect.y + rng.randint(0, self.size - inner_piece_size)
+            world.spawn_fragment(inner_piece_x, inner_piece_y, inner_piece_size, self.color, self.mass * 0.1,
+                                 (rng.uniform(-5, 5), rng.uniform(-5, 5)))
+
+
+class World:
+    """Every bullet and cube in a 2dbullet.py scene, advanced with ``step``.
+
+    ``random`` drives bullet spread and explosions, so a world built with a
+    ``seed`` replays identically given the same shots. ``on_hit(bullet, cube,
+    impact)`` is called for every bullet that hits a cube.
+    """
+
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, seed=None, debris_budget=DEBRIS_BUDGET):
+        self.width = width
+        self.height = height
+        self.random = random.Random(seed)
+        self.air_density = 1.0
+        self.wind_speed = 1.0
+        self.wind_direction = 0.0  # radians
+        self.latitude = 0.0  # radians
+        self.bullet_pool = BulletPool()
+        self.cubes = {}  # Every cube, as an insertion-ordered set
+        self.active_cubes = {}  # Cubes that are awake and need updating
+        self.broadphase = SpatialHash()
+        self.sleeping_cubes = SpatialHash()
+        self.fragment_pool = FragmentPool(lambda size, color: Cube(self, 0, 0, size, color, 0.0), debris_budget)
+        self.on_hit = None
+        self.hits = 0
+
+    @property
+    def bullets(self):
+        return self.bullet_pool.owners[:len(self.bullet_pool)]
+
+    @property
+    def candidate_pairs(self):
+        return self.broadphase.candidate_pairs + self.sleeping_cubes.candidate_pairs
+
+    @property
+    def naive_pairs(self):
+        return self.broadphase.naive_pairs + self.sleeping_cubes.naive_pairs
+
+    def add_cube(self, x, y, size, color, mass):
+        cube = Cube(self, x, y, size, color, mass)
+        self.cubes[cube] = None
+        self.active_cubes[cube] = None
+        return cube
+
+    def spawn_fragment(self, x, y, size, color, mass, velocity):
+        # Fragments come from the pool, which reuses the cubes of evicted debris
+        piece = self.fragment_pool.acquire(size, color)
+        piece.reset(x, y, mass, velocity)
+        self.cubes[piece] = None
+        self.active_cubes[piece] = None
+        return piece
+
+    def remove_cube(self, cube):
+        if cube.asleep:
+            cube.asleep = False
+            self.sleeping_cubes.remove(cube)
+        self.cubes.pop(cube, None)
+        self.active_cubes.pop(cube, None)
+
+    def discard(self, cube):
+        # Drop a cube for good, returning it to the fragment pool if it came from there
+        self.remove_cube(cube)
+        self.fragment_pool.release(cube)
+
+    def fire(self, x, y, speed, spin_rate, angle=None, shape=BULLET_SHAPE,
+             drag_coefficient=BULLET_DRAG_COEFFICIENT):
+        """Fire a bullet from ``(x, y)``, by default at a random angle within 5 degrees of level."""
+        if angle is None:
+            angle = self.random.uniform(-5, 5)
+        bullet = Bullet(self.bullet_pool)
+        self.bullet_pool.spawn(x, y, angle, speed, shape, drag_coefficient, spin_rate, owner=bullet)
+        return bullet
+
+    def apply(self, code, values):
+        """Apply one input event: ``FIRE`` (x, y, speed, spin_rate), ``WIND_SPEED`` or ``AIR_DENSITY`` (value)."""
+        if code == FIRE:
+            self.fire(*values)
+        elif code == WIND_SPEED:
+            self.wind_speed, = values
+        elif code == AIR_DENSITY:
+            self.air_density, = values
+        else:
+            raise ValueError(f"unknown event {code}")
+
+    def sleep(self, cube):
+        # Stop updating the cube; it still collides through the sleeping_cubes grid
+        cube.asleep = True
+        cube.rest_time = 0.0
+        cube.velocity[0] = 0.0
+        cube.previous[:] = cube.position
+        del self.active_cubes[cube]
+        self.sleeping_cubes.insert(cube)
+
+    def wake(self, cube):
+        if cube.asleep and not cube.is_broken:
+            cube.asleep = False
+            self.sleeping_cubes.remove(cube)
+            self.active_cubes[cube] = None
+
+    def wake_nearby(self, rect):
+        # An impact wakes the sleeping cubes around it
+        for cube in self.sleeping_cubes.query(rect.inflate(2 * WAKE_RADIUS, 2 * WAKE_RADIUS)):
+            self.wake(cube)
+
+    def begin_step(self):
+        """Remember positions at the start of a physics step, for render interpolation."""
+        self.bullet_pool.snapshot()
+        for cube in self.active_cubes:
+            cube.previous[:] = cube.position
+
+    def step(self, dt=1.0):
+        """Advance everything by ``dt`` frames, resolving hits along the way."""
+        self.bullet_pool.step(self.air_density, self.wind_speed, self.wind_direction, self.latitude, dt=dt)
+        for cube in list(self.active_cubes):
+            cube.update(dt)
+        self.check_collisions()
+        self.bullet_pool.cull(self.width, self.height)
+        # Keep the debris count bounded under sustained fire
+        for piece in self.fragment_pool.enforce_budget():
+            self.remove_cube(piece)
+
+    def check_collisions(self):
+        # Check for bullet-cube collision along the whole path each bullet moved this step, so fast
+        # bullets hit what they pass through. Only cubes sharing a grid cell with the path are tested;
+        # sleeping cubes stay in their own grid, so only awake ones are re-bucketed every step.
+        self.broadphase.rebuild(self.active_cubes)
+        self.sleeping_cubes.reset_counts()
+        pool = self.bullet_pool
+        n = len(pool)
+        start = pool.start[:n]
+        end = pool.position[:n]
+        low = np.floor(np.minimum(start, end) - BULLET_SIZE / 2).astype(int).tolist()
+        high = np.ceil(np.maximum(start, end) + BULLET_SIZE / 2).astype(int).tolist()
+        segments = []
+        candidates = []
+        for slot, ((left, top), (right, bottom)) in enumerate(zip(low, high)):
+            path = Rect(left, top, right - left, bottom - top)
+            for cube in self.broadphase.query(path) + self.sleeping_cubes.query(path):
+                segments.append(slot)
+                candidates.append(cube)
+        if not candidates:
+            return
+
+        boxes = [(cube.rect.left, cube.rect.top, cube.rect.right, cube.rect.bottom) for cube in candidates]
+        hits = first_hits(sweep_aabb(start, end, boxes, BULLET_SIZE / 2, (segments, range(len(candidates)))))
+        # Look the bullets up first: releasing one moves another into its pool slot
+        for bullet, index in zip([pool.owners[slot] for slot in hits.segment.tolist()], hits.box.tolist()):
+            cube = candidates[index]
+            bullet_mass = float(bullet.mass)
+            bullet_velocity = math.hypot(*bullet.velocity)
+
+            # Conservation of momentum between the bullet and the cube
+            total_momentum = bullet_mass * bullet_velocity + cube.mass * math.hypot(*cube.velocity)
+            bullet_velocity_after = total_momentum / bullet_mass
+
+            # The energy absorbed by the cube is the bullet's change in kinetic energy
+            energy_absorbed = 0.5 * bullet_mass * bullet_velocity**2 - 0.5 * bullet_mass * bullet_velocity_after**2
+
+            cube.explode()
+            self.wake_nearby(cube.rect)
+            pool.release(bullet.slot)
+            self.hits += 1
+            if self.on_hit is not None:
+                self.on_hit(bullet, cube, Impact(bullet_mass, bullet_velocity, bullet_velocity_after, cube.mass,
+                                                 energy_absorbed))
+
+
+def demo_world(seed=None):
+    """The scene 2dbullet.py opens with: a wooden and a glass cube side by side."""
+    world = World(seed=seed)
+    world.add_cube(world.width // 2 - 100, world.height // 2, 100, RED, 1.0)
+    world.add_cube(world.width // 2 + 100, world.height // 2, 100, BLUE, 0.5)
+    return world
+
+
+def replay(recording):
+    """Rerun a recorded 2dbullet.py session from ``bulletsim.replay.read_log``; returns the final world."""
+    world = demo_world(recording.seed)
+    dt = 1.0 / recording.substeps
+    for frame in recording.frames:
+        for code, values in frame.events:
+            world.apply(code, values)
+        for _ in range(frame.ticks * frame.repeat):
+            world.begin_step()
+            for _ in range(recording.substeps):
+                world.step(dt)
+    return world
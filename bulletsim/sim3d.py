@@ -0,0 +1,218 @@
+"""The 3dbullet.py scene without OpenGL: the camera, bullets, both targets and their pieces.
+
+Units are metres and seconds with y up, and the floor is the plane y = -1.
+Player input reaches the scene as events passed to ``Scene.apply`` and
+``Scene.step(dt)`` advances everything, so the front end only draws and the same
+scene replays headless.
+"""
+import numpy as np
+
+from bulletsim.bullet_manager import BulletManager
+from bulletsim.fragment_store import FragmentStore
+from bulletsim.narrowphase import sweep_spheres
+
+GRAVITY = -9.81  # m/s^2
+AIR_RESISTANCE = 0.05  # Fraction of bullet velocity lost every frame
+MOVE_SPEED = 0.1
+JUMP_SPEED = 0.5
+SENSITIVITY = 0.1  # Degrees of turn per pixel of mouse motion
+CUBE_POSITION = (0, 1, -5)
+CUBE_SIZE = (0.5, 0.5, 0.5)
+OTHER_OBJECT_POSITION = (3, 1, -5)
+OTHER_OBJECT_SIZE = (0.8, 0.8, 0.8)
+
+# Keys held down in a MOVE event
+FORWARD, BACK, LEFT, RIGHT, JUMP = 1, 2, 4, 8, 16
+
+# Input events and the struct formats of their values
+SETUP, FIRE, SPEED, MOVE, LOOK = 1, 2, 3, 4, 5
+EVENT_FORMATS = {SETUP: 'ddddd', FIRE: '', SPEED: 'd', MOVE: 'B', LOOK: 'hh'}
+
+
+class Cube:
+    def __init__(self, position, size, velocity, rotation, material_color, mass, is_wooden):
+        self.position = position
+        self.size = size
+        self.velocity = velocity
+        self.rotation = rotation
+        self.material_color = material_color
+        self.mass = mass
+        self.is_wooden = is_wooden
+
+
+def apply_gravity(object, dt, gravity=GRAVITY):
+    object.velocity[1] += gravity * dt
+    object.position += object.velocity * dt
+
+    # Stop the object from going below the floor
+    if object.position[1] - object.size[1] / 2 < -1:
+        object.position[1] = -1 + object.size[1] / 2
+        object.velocity[1] = 0
+
+
+def calculate_distance(position1, position2):
+    return np.linalg.norm(position1 - position2)
+
+
+def calculate_collision_force(mass, dt, speed):
+    acceleration = speed / dt  # Calculate acceleration using velocity change and time
+    force = mass * acceleration  # Calculate force using mass and acceleration
+    return force
+
+
+class Scene:
+    """Everything in a 3dbullet.py session, advanced with ``step``.
+
+    ``random`` scatters the pieces of a shattered target, so a scene built with a
+    ``seed`` replays identically given the same inputs. ``on_hit(slot, target)``
+    is called for every hit with the bullet's row in ``bullets``, after ``force``
+    and ``distance`` are updated.
+    """
+
+    def __init__(self, bullet_radius, speed, cube_mass, other_object_mass, bullet_mass, seed=None):
+        self.random = np.random.default_rng(seed)
+        self.bullet_radius = bullet_radius
+        self.bullet_speed = speed
+        self.bullet_mass = bullet_mass
+        self.distance = 0
+        self.force = 0
+
+        self.camera_pos = np.array([0, 0, 5], dtype='float64')
+        self.camera_front = np.array([0, 0, -1], dtype='float64')
+        self.camera_up = np.array([0, 1, 0], dtype='float64')
+        self.yaw, self.pitch = 0, 0
+        self.is_jumping = False
+
+        self.cube = Cube(np.array(CUBE_POSITION, dtype='float64'), np.array(CUBE_SIZE), np.zeros(3), np.zeros(3),
+                         (0.6, 0.3, 0.0), cube_mass, True)
+        self.other_object = Cube(np.array(OTHER_OBJECT_POSITION, dtype='float64'), np.array(OTHER_OBJECT_SIZE),
+                                 np.zeros(3), np.zeros(3), (0.0, 0.0, 1.0), other_object_mass, False)
+        self.bullets = BulletManager()
+        self.pieces = FragmentStore()  # What shattered targets broke into
+        self.on_hit = None
+
+    def apply(self, code, values):
+        """Apply one input event: ``FIRE``, ``SPEED`` (speed), ``MOVE`` (key mask) or ``LOOK`` (dx, dy)."""
+        if code == FIRE:
+            self.fire()
+        elif code == SPEED:
+            self.bullet_speed, = values
+        elif code == MOVE:
+            self.move(*values)
+        elif code == LOOK:
+            self.look(*values)
+        else:
+            raise ValueError(f"unknown event {code}")
+
+    def fire(self):
+        # Add a bullet with the current camera position and direction
+        self.bullets.fire(self.camera_pos, self.camera_front, self.bullet_radius, self.bullet_mass, self.bullet_speed)
+
+    def move(self, keys):
+        if keys & FORWARD:
+            self.camera_pos += MOVE_SPEED * self.camera_front
+        if keys & BACK:
+            self.camera_pos -= MOVE_SPEED * self.camera_front
+        if keys & LEFT:
+            self.camera_pos -= np.cross(self.camera_front, self.camera_up) * MOVE_SPEED
+        if keys & RIGHT:
+            self.camera_pos += np.cross(self.camera_front, self.camera_up) * MOVE_SPEED
+        if keys & JUMP and not self.is_jumping:
+            self.camera_pos += JUMP_SPEED * self.camera_up
+            self.is_jumping = True
+
+    def look(self, x_offset, y_offset):
+        self.yaw += x_offset * SENSITIVITY
+        self.pitch -= y_offset * SENSITIVITY
+        self.pitch = np.clip(self.pitch, -89.0, 89.0)
+
+    def step(self, dt):
+        # Collision detection with the floor
+        if self.camera_pos[1] < -1 + 0.5:  # Assume user's height as 1.0 and floor level at -1.0
+            self.camera_pos[1] = -1 + 0.5  # Restrict camera's y-position to the floor level
+            self.is_jumping = False
+
+        front = np.array([
+            np.cos(np.radians(self.yaw)) * np.cos(np.radians(self.pitch)),
+            np.sin(np.radians(self.pitch)),
+            np.sin(np.radians(self.yaw)) * np.cos(np.radians(self.pitch))
+        ])
+        self.camera_front = front / np.linalg.norm(front)
+
+        cube = self.cube
+        other_object = self.other_object
+        apply_gravity(cube, dt)
+        apply_gravity(other_object, dt)
+
+        bullets = self.bullets
+        bullets.step(dt, GRAVITY, AIR_RESISTANCE)
+        n = len(bullets)
+        # Every bullet's path this frame against both targets at once, so fast bullets cannot pass through
+        hits = sweep_spheres(bullets.start[:n], bullets.position[:n], bullets.radius[:n],
+                             [cube.position, other_object.position], [cube.size, other_object.size])
+        for slot, target in zip(hits.sphere.tolist(), hits.box.tolist()):
+            if target == 0:
+                self._shatter(cube, slot, dt, 10, 10, cube.size)
+
+                # Reset the cube position and size
+                cube.position = np.array(CUBE_POSITION, dtype='float64')
+                cube.size = np.array(CUBE_SIZE)
+                if self.on_hit is not None:
+                    self.on_hit(slot, cube)
+            else:
+                # The glass pieces have always been sized from the wooden cube
+                self._shatter(other_object, slot, dt, 24, 15, cube.size)
+
+                # Reset the other object position and size
+                other_object.position = np.array(OTHER_OBJECT_POSITION, dtype='float64')
+                other_object.size = np.array(OTHER_OBJECT_SIZE)
+                if self.on_hit is not None:
+                    self.on_hit(slot, other_object)
+
+        # Bullets that have expired, flown out of range or left the floor are dropped
+        bullets.cull()
+        self.pieces.step(dt)
+
+    def _shatter(self, target, slot, dt, num_pieces, speed_divisor, piece_base_size):
+        # Break the target into num_pieces smaller cubes flying away from the bullet in slot
+        bullets = self.bullets
+        self.force = calculate_collision_force(bullets.mass[slot], dt, self.bullet_speed)
+        self.distance = calculate_distance(bullets.initial_position[slot], target.position)
+
+        # Adjust the impact effect based on the distance
+        impact_factor = max(0, 1 - self.distance / 100)  # Adjust the divisor to control the drop-off rate
+        # Each piece once shrank a size array shared by all of them, so they all end up this size
+        piece_size = piece_base_size / np.sqrt(num_pieces) * impact_factor ** (num_pieces + 1)
+
+        # Per piece: an offset from the target's centre, a direction and a rotation, drawn in the same
+        # order as when pieces were made one at a time, so seeded scenes shatter the same way
+        draws = self.random.random((num_pieces, 9))
+        piece_position = target.position + (draws[:, 0:3] - 0.5) * target.size * 0.25
+
+        # Send each piece away from the collision point
+        velocity_direction = draws[:, 3:6] * 2.0 - 1.0
+        toward = velocity_direction @ bullets.direction[slot] > 0
+        velocity_direction[toward] = -velocity_direction[toward]
+        piece_velocity = velocity_direction * (np.linalg.norm(target.size) * 5 * impact_factor * (
+                self.bullet_speed / speed_divisor))
+
+        # Distribute the mass equally among the smaller pieces
+        self.pieces.add(piece_position, piece_velocity, piece_size, target.material_color, target.mass / num_pieces)
+
+
+def replay(recording):
+    """Rerun a recorded 3dbullet.py session from ``bulletsim.replay.read_log``; returns the final scene.
+
+    The first event is the ``SETUP`` the session started with.
+    """
+    scene = None
+    for frame in recording.frames:
+        for code, values in frame.events:
+            if code == SETUP:
+                scene = Scene(*values, seed=recording.seed)
+            else:
+                scene.apply(code, values)
+        dt = frame.ticks / 1000.0
+        for _ in range(frame.repeat):
+            scene.step(dt)
+    return scene
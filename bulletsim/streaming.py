@@ -0,0 +1,120 @@
+import math
+import os
+
+import numpy as np
+
+from bulletsim.trajectory import (
+    G, RHO, C_D, A, MASS, INITIAL_VELOCITY, LAUNCH_ANGLE, TIME_STEP, SPEED_OF_SOUND
+    )
+
+CHUNK_SIZE = 4096
+
+
+def estimate_flight_time(initial_velocity=INITIAL_VELOCITY, launch_angle=LAUNCH_ANGLE):
+    """Drag-free time of flight, an upper bound for the drag model in ``integrate_trajectory``.
+
+    Drag there always adds to gravity on the vertical axis, so a shot can only land
+    sooner than it would in a vacuum.
+    """
+    return max(2 * initial_velocity * math.sin(launch_angle) / G, 0.0)
+
+
+def iter_trajectory(initial_velocity=INITIAL_VELOCITY, launch_angle=LAUNCH_ANGLE, mass=MASS,
+                    drag_coefficient=C_D, area=A, time_step=TIME_STEP, chunk_size=CHUNK_SIZE,
+                    dtype=np.float64, drag_model=None, atmosphere=None, altitude=0.0):
+    """Yield the samples of ``integrate_trajectory`` as ``(n, 3)`` arrays of ``(t, x, y)``.
+
+    Every chunk but the last holds ``chunk_size`` rows. Each chunk is a fresh array,
+    so consumers may keep them; nothing else is retained between chunks.
+    ``drag_model``, ``atmosphere`` and ``altitude`` work as in ``integrate_trajectory``.
+    """
+    # Same expression order as integrate_trajectory so the samples match it bit for bit
+    c = 0.5 * RHO * drag_coefficient * area
+    rho = RHO
+    speed_of_sound = SPEED_OF_SOUND
+    time = 0.0
+    x = 0.0
+    y = 0.0
+    vx = initial_velocity * math.cos(launch_angle)
+    vy = initial_velocity * math.sin(launch_angle)
+
+    while y >= 0:
+        chunk = np.empty((chunk_size, 3), dtype=dtype)
+        for i in range(chunk_size):
+            if y < 0:
+                yield chunk[:i]
+                return
+            chunk[i] = (time, x, y)
+
+            if atmosphere is not None:
+                rho, speed_of_sound = atmosphere.conditions_at(altitude + y)
+                c = 0.5 * rho * drag_coefficient * area
+            if drag_model is not None:
+                c = 0.5 * rho * drag_model.coefficient(math.hypot(vx, vy) / speed_of_sound) * area
+
+            vx += -((c * vx ** 2) / mass) * time_step
+            vy += (-G - ((c * vy ** 2) / mass)) * time_step
+            x += vx * time_step
+            y += vy * time_step
+            time += time_step
+        yield chunk
+
+
+def collect_trajectory(initial_velocity=INITIAL_VELOCITY, launch_angle=LAUNCH_ANGLE, mass=MASS,
+                       drag_coefficient=C_D, area=A, time_step=TIME_STEP, out=None, dtype=np.float64,
+                       drag_model=None, atmosphere=None, altitude=0.0):
+    """Gather ``iter_trajectory`` into one ``(n, 3)`` array sized from ``estimate_flight_time``.
+
+    ``out`` may be a preallocated ``(rows, 3)`` array (e.g. a memory map) to write
+    into, and the filled leading rows of it are returned; it is never replaced, so
+    ValueError is raised if the shot needs more rows than it has. Otherwise one is
+    allocated and only grows, by doubling, if the estimate turns out short; with
+    drag the estimate is several times too long, so the filled rows are copied out
+    and the oversized buffer freed.
+    """
+    owned = out is None
+    if owned:
+        rows = int(estimate_flight_time(initial_velocity, launch_angle) / time_step) + 2
+        out = np.empty((rows, 3), dtype=dtype)
+
+    count = 0
+    for chunk in iter_trajectory(initial_velocity, launch_angle, mass, drag_coefficient, area, time_step,
+                                 dtype=out.dtype, drag_model=drag_model, atmosphere=atmosphere,
+                                 altitude=altitude):
+        if count + len(chunk) > len(out):
+            if not owned:
+                out[count:] = chunk[:len(out) - count]
+                raise ValueError(f"out has {len(out)} rows, but the trajectory needs more than that; "
+                                 f"the first {len(out)} samples were written")
+            grown = np.empty((max(2 * len(out), count + len(chunk)), 3), dtype=out.dtype)
+            grown[:count] = out[:count]
+            out = grown
+        out[count:count + len(chunk)] = chunk
+        count += len(chunk)
+    if owned and count < len(out):
+        return out[:count].copy()
+    return out[:count]
+
+
+def write_trajectory(file, initial_velocity=INITIAL_VELOCITY, launch_angle=LAUNCH_ANGLE, mass=MASS,
+                     drag_coefficient=C_D, area=A, time_step=TIME_STEP, dtype=np.float64, drag_model=None,
+                     atmosphere=None, altitude=0.0):
+    """Stream ``iter_trajectory`` to a path or binary file as raw row-major ``(t, x, y)`` records.
+
+    ``file`` may be any object with a binary ``write`` method, such as
+    ``io.BytesIO`` or a ``gzip`` stream, not only a real file. Read it back with ``np.fromfile(path, dtype).reshape(-1, 3)``. Returns the number
+    of samples written.
+    """
+    count = 0
+    handle = open(file, 'wb') if isinstance(file, (str, os.PathLike)) else file
+    try:
+        for chunk in iter_trajectory(initial_velocity, launch_angle, mass, drag_coefficient, area,
+                                     time_step, dtype=dtype, drag_model=drag_model, atmosphere=atmosphere,
+                                     altitude=altitude):
+            # write() rather than tofile(), which needs a real file descriptor
+            handle.write(memoryview(chunk).cast('B'))
+            count += len(chunk)
+    finally:
+        if handle is not file:
+            handle.close()
+    return count
@@ -0,0 +1,69 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+class SweepHits(NamedTuple):
+    segment: np.ndarray  # Index of the moving segment for each hit
+    box: np.ndarray  # Index of the box it hits
+    time: np.ndarray  # Fraction of the segment travelled at first contact; 0 if it starts overlapping
+    normal: np.ndarray  # (k, 2) outward normal of the face hit; zero if it starts overlapping
+
+
+def sweep_aabb(start, end, boxes, half_size=0.0, pairs=None) -> SweepHits:
+    """Continuous collision of moving points or boxes against axis-aligned boxes.
+
+    ``start`` and ``end`` are ``(n, 2)`` positions at the beginning and end of a
+    step; ``boxes`` is ``(m, 4)`` as ``(left, top, right, bottom)``. A nonzero
+    ``half_size`` sweeps a square of that half-width instead of a point, by growing
+    every box by it. ``pairs`` is an optional ``(segment_indices, box_indices)``
+    pair of candidate arrays from a broadphase; by default every segment is
+    tested against every box. All pairs are solved at once with the slab method.
+    As with ``Rect.colliderect``, merely touching an edge is not a hit.
+    """
+    start = np.asarray(start, dtype=np.float64).reshape(-1, 2)
+    end = np.asarray(end, dtype=np.float64).reshape(-1, 2)
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if pairs is None:
+        segment, box = (index.ravel() for index in np.meshgrid(np.arange(len(start)), np.arange(len(boxes)),
+                                                              indexing='ij'))
+    else:
+        segment, box = (np.asarray(index, dtype=np.intp) for index in pairs)
+
+    origin = start[segment]
+    delta = end[segment] - origin
+    low = boxes[box, :2] - half_size
+    high = boxes[box, 2:] + half_size
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inverse = 1.0 / delta
+        near = (low - origin) * inverse
+        far = (high - origin) * inverse
+    entry = np.minimum(near, far)
+    exit_ = np.maximum(near, far)
+    # An axis without motion either always overlaps the slab or never does
+    still = delta == 0
+    inside = (origin > low) & (origin < high)
+    entry[still] = np.where(inside[still], -np.inf, np.inf)
+    exit_[still] = np.where(inside[still], np.inf, -np.inf)
+
+    axis = np.argmax(entry, axis=1)
+    t_entry = np.take_along_axis(entry, axis[:, None], axis=1)[:, 0]
+    t_exit = exit_.min(axis=1)
+    hit = (t_entry < t_exit) & (t_exit > 0) & (t_entry <= 1)
+
+    segment, box, axis, t_entry = segment[hit], box[hit], axis[hit], t_entry[hit]
+    rows = np.arange(len(segment))
+    normal = np.zeros((len(segment), 2))
+    normal[rows, axis] = np.where(t_entry < 0, 0.0, -np.sign(delta[hit][rows, axis]))
+    return SweepHits(segment, box, np.maximum(t_entry, 0.0), normal)
+
+
+def first_hits(hits: SweepHits) -> SweepHits:
+    """Only the earliest hit of each segment, ordered by segment."""
+    order = np.lexsort((hits.time, hits.segment))
+    segment = hits.segment[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = segment[1:] != segment[:-1]
+    order = order[first]
+    return SweepHits(hits.segment[order], hits.box[order], hits.time[order], hits.normal[order])
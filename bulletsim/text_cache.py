@@ -0,0 +1,48 @@
+import functools
+
+TEXT_CACHE_SIZE = 256
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by ``(font, text, color, antialias)``.
+
+    ``render`` has the same effect as ``font.render(text, antialias, color)`` but
+    only calls it on a miss. ``cache_info`` reports hits, misses and size as for
+    any ``functools.lru_cache``.
+    """
+
+    def __init__(self, maxsize=TEXT_CACHE_SIZE):
+        self.render = functools.lru_cache(maxsize)(self._render)
+        self.cache_info = self.render.cache_info
+        self.cache_clear = self.render.cache_clear
+
+    @staticmethod
+    def _render(font, text, color, antialias=True):
+        return font.render(text, antialias, color)
+
+
+class Label:
+    """One HUD string, formatted and looked up again only when its values change.
+
+    ``changed`` is True after a ``render`` call that produced a different surface,
+    for renderers that only redraw what moved.
+    """
+
+    def __init__(self, cache, font, template, color, antialias=True):
+        self.cache = cache
+        self.font = font
+        self.template = template
+        self.color = color
+        self.antialias = antialias
+        self.values = None
+        self.surface = None
+        self.changed = False
+
+    def render(self, *values):
+        if values == self.values and self.surface is not None:
+            self.changed = False
+            return self.surface
+        self.values = values
+        self.surface = self.cache.render(self.font, self.template.format(*values), self.color, self.antialias)
+        self.changed = True
+        return self.surface
@@ -0,0 +1,78 @@
+import time
+
+STEP = 1 / 60
+
+
+class FixedTimestep:
+    """Fixed-step simulation clock fed by variable frame times.
+
+    Each frame's duration goes into an accumulator, and ``run`` takes as many whole
+    ``step`` seconds out of it as it holds. Each step is split into ``substeps``
+    calls of ``simulate(dt)``, with ``dt`` as a fraction of one step. Whatever is
+    left over becomes ``alpha``, the fraction of a step to interpolate
+    rendering by. At most ``max_steps`` run per frame; after a stall the backlog is
+    dropped rather than letting the simulation fall further behind.
+
+    ``unthrottled`` ignores the frame time and steps for ``budget`` seconds of wall
+    time per call instead, so physics runs as fast as the machine allows while
+    the display still refreshes. ``steps_per_second`` measures physics throughput
+    in either mode, independently of the frame rate.
+    """
+
+    def __init__(self, step=STEP, substeps=1, max_steps=5, unthrottled=False, budget=1 / 30):
+        self.step = step
+        self.substeps = substeps
+        self.max_steps = max_steps
+        self.unthrottled = unthrottled
+        self.budget = budget
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.steps = 0
+        self._window_start = time.perf_counter()
+        self._window_steps = 0
+
+    def _step(self, simulate, begin_step):
+        if begin_step is not None:
+            begin_step()
+        dt = 1.0 / self.substeps
+        for _ in range(self.substeps):
+            simulate(dt)
+        self.steps += 1
+        self._window_steps += 1
+
+    def run(self, frame_time, simulate, begin_step=None):
+        """Advance by ``frame_time`` seconds; returns the number of whole steps taken.
+
+        ``begin_step()``, if given, is called before each step, e.g. to snapshot
+        positions for interpolation.
+        """
+        taken = 0
+        if self.unthrottled:
+            deadline = time.perf_counter() + self.budget
+            while True:
+                self._step(simulate, begin_step)
+                taken += 1
+                if time.perf_counter() >= deadline:
+                    break
+            self.accumulator = 0.0
+            self.alpha = 1.0
+            return taken
+
+        self.accumulator += frame_time
+        while self.accumulator >= self.step and taken < self.max_steps:
+            self._step(simulate, begin_step)
+            self.accumulator -= self.step
+            taken += 1
+        if taken == self.max_steps:
+            self.accumulator = min(self.accumulator, self.step)
+        self.alpha = self.accumulator / self.step
+        return taken
+
+    def steps_per_second(self):
+        """Steps per wall-clock second since the previous call."""
+        now = time.perf_counter()
+        elapsed = now - self._window_start
+        rate = self._window_steps / elapsed if elapsed > 0 else 0.0
+        self._window_start = now
+        self._window_steps = 0
+        return rate
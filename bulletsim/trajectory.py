@@ -0,0 +1,69 @@
+import math
+
+# Constants
+G = 9.81  # Acceleration due to gravity (m/s^2)
+RHO = 1.225  # Air density (kg/m^3)
+C_D = 0.5  # Drag coefficient
+A = math.pi * (0.01 ** 2)  # Cross-sectional area of the bullet (m^2)
+MASS = 0.01  # Mass of the bullet (kg)
+INITIAL_VELOCITY = 100  # Initial velocity of the bullet (m/s)
+LAUNCH_ANGLE = math.radians(45)  # Launch angle of the bullet (radians)
+TIME_STEP = 0.01  # Time step for numerical integration (s)
+SPEED_OF_SOUND = 340.294  # Speed of sound at sea level, for Mach-dependent drag (m/s)
+
+
+def integrate_trajectory(initial_velocity=INITIAL_VELOCITY, launch_angle=LAUNCH_ANGLE, mass=MASS,
+                         drag_coefficient=C_D, area=A, time_step=TIME_STEP, drag_model=None,
+                         atmosphere=None, altitude=0.0):
+    """Integrate a single shot with explicit Euler until it drops below y = 0.
+
+    With a ``drag_model`` (see ``bulletsim.drag``) the drag coefficient is looked up
+    from the Mach number every step and ``drag_coefficient`` is ignored. With an
+    ``atmosphere`` (see ``bulletsim.atmosphere``) air density and the speed of sound
+    follow the bullet's height above a launch site at ``altitude`` metres instead of
+    the sea-level ``RHO`` and ``SPEED_OF_SOUND``.
+
+    Returns the ``(time_values, x_values, y_values)`` lists of every sample taken
+    while the bullet was at or above the ground.
+    """
+    # Lists to store the trajectory data
+    time_values = []
+    x_values = []
+    y_values = []
+
+    # Initial conditions
+    time = 0
+    x = 0
+    y = 0
+    vx = initial_velocity * math.cos(launch_angle)
+    vy = initial_velocity * math.sin(launch_angle)
+    rho = RHO
+    speed_of_sound = SPEED_OF_SOUND
+
+    # Numerical integration loop
+    while y >= 0:
+        time_values.append(time)
+        x_values.append(x)
+        y_values.append(y)
+
+        if atmosphere is not None:
+            rho, speed_of_sound = atmosphere.conditions_at(altitude + y)
+        if drag_model is not None:
+            drag_coefficient = drag_model.coefficient(math.hypot(vx, vy) / speed_of_sound)
+
+        # Calculate the acceleration components
+        ax = -((0.5 * rho * drag_coefficient * area * vx ** 2) / mass)
+        ay = -G - ((0.5 * rho * drag_coefficient * area * vy ** 2) / mass)
+
+        # Update the velocity components
+        vx += ax * time_step
+        vy += ay * time_step
+
+        # Update the position components
+        x += vx * time_step
+        y += vy * time_step
+
+        # Update time
+        time += time_step
+
+    return time_values, x_values, y_values
@@ -2,17 +2,18 @@ import pygame
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
-from OpenGL.GLUT import glutSolidSphere 
 import pybullet as p
 import pybullet_data
 import numpy as np
 
+from bulletsim.geometry import SPHERES
+
 def draw_object(position):
     glColor3f(0.0, 1.0, 0.0)  # Set the object color to green
 
     glPushMatrix()
     glTranslate(*position)
-    glutSolidSphere(0.5, 8, 8)  # Draw a sphere with radius 0.5
+    SPHERES.draw(0.5, 8, 8)  # Draw a sphere with radius 0.5
     glPopMatrix()
 
 def draw_floor():
@@ -29,8 +30,7 @@ def draw_bullet(position):
 
     glPushMatrix()
     glTranslate(*position)
-    quadric = gluNewQuadric()
-    gluSphere(quadric, 0.1, 8, 8)  # Draw a sphere with radius 0.1
+    SPHERES.draw(0.1, 8, 8)  # Draw a sphere with radius 0.1, tessellated only the first time
     glPopMatrix()
 
 def draw_target():